@@ -1,127 +1,320 @@
-import json
+import logging
+import os
+import time
+from datetime import date, datetime
 
+from langchain_core.runnables import Runnable
+from langgraph.config import get_stream_writer
+from pydantic import BaseModel
 from uipath_langchain.chat import UiPathChat
 
-from state import AnalysisResult, Recommendation, ResearchResult, State, StockData
-from tools import search
+from summary import compose_provisional_summary, update_leaderboard
+from prompts import (
+    Messages,
+    analyst_messages,
+    market_context,
+    repair_messages,
+    research_messages,
+    strategist_messages,
+)
+from state import AnalysisResult, ModelRoute, Recommendation, ResearchResult, State, StockData
+from tools import prefetch_search, search, search_query
 
-llm = UiPathChat(model="gpt-4o-mini-2024-07-18", temperature=0.7)
+PREMIUM_MODEL = os.getenv("PREMIUM_MODEL", "gpt-4o-2024-08-06")
+STANDARD_MODEL = os.getenv("STANDARD_MODEL", "gpt-4o-mini-2024-07-18")
+TEMPLATE_MODEL = "template"
+TIER_MODELS = {"premium": PREMIUM_MODEL, "standard": STANDARD_MODEL, "template": TEMPLATE_MODEL}
+
+# Significance score >= PREMIUM_SCORE routes to PREMIUM_MODEL; < TEMPLATE_SCORE skips the LLM.
+# The premium bar needs a ~25% move (or ~20% with heavy volume / earnings), so on a
+# most-active screen only the few outliers reach the expensive model.
+PREMIUM_SCORE = float(os.getenv("PREMIUM_SCORE", "6.0"))
+TEMPLATE_SCORE = float(os.getenv("TEMPLATE_SCORE", "1.0"))
+EARNINGS_WINDOW_DAYS = 3
+# Most-active names routinely trade 2-4x their average volume, so volume only
+# adds a tie-breaking point: +1 at 5x the 3-month average, and no more.
+VOLUME_RATIO_PER_POINT = 4.0
+MAX_VOLUME_SCORE = 1.0
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens (input, cached input, output).
+MODEL_PRICING = {
+    "gpt-4o-2024-08-06": (2.50, 1.25, 10.00),
+    "gpt-4o-mini-2024-07-18": (0.15, 0.075, 0.60),
+}
+
+# Completion token caps per stage.
+MAX_TOKENS = {
+    "research": int(os.getenv("RESEARCH_MAX_TOKENS", "400")),
+    "analyst": int(os.getenv("ANALYST_MAX_TOKENS", "300")),
+    "strategist": int(os.getenv("STRATEGIST_MAX_TOKENS", "300")),
+}
+STAGE_SCHEMAS: dict[str, type[BaseModel]] = {
+    "research": ResearchResult,
+    "analyst": AnalysisResult,
+    "strategist": Recommendation,
+}
+
+_llms: dict[tuple[str, str], Runnable] = {}
+_unpriced: set[str] = set()
+
+# Publish a provisional summary every N completed stocks (0 disables).
+PROVISIONAL_EVERY = int(os.getenv("PROVISIONAL_EVERY", "5"))
 
 
 def _current_stock(state: State) -> StockData:
     return state.stocks[state.current_index]
 
 
-def _parse_json(text: str) -> dict:
-    stripped = text.strip()
-    if stripped.startswith("```"):
-        lines = stripped.split("\n")
-        stripped = "\n".join(lines[1:-1]) if len(lines) > 2 else stripped
+def build_llm(model: str, stage: str, **chat_kwargs) -> Runnable:
+    """Chat model for a stage, capped at its max_tokens and bound to its output schema."""
+    chat = UiPathChat(model=model, temperature=0.7, max_tokens=MAX_TOKENS[stage], **chat_kwargs)
+    return chat.with_structured_output(STAGE_SCHEMAS[stage], include_raw=True)
+
+
+def _llm(model: str, stage: str) -> Runnable:
+    key = (model, stage)
+    if key not in _llms:
+        _llms[key] = build_llm(model, stage)
+    return _llms[key]
+
+
+def _significance(stock: StockData, today: date | None = None) -> float:
+    """Score a move: |change %| / 5, plus excess volume ratio / 4 (capped at 1), plus 1 near earnings."""
+    score = abs(stock.change_percent) / 5
+    if stock.avg_volume_3m > 0:
+        excess = max(stock.volume / stock.avg_volume_3m - 1, 0.0)
+        score += min(excess / VOLUME_RATIO_PER_POINT, MAX_VOLUME_SCORE)
+    if stock.earnings_date:
+        try:
+            earnings = datetime.strptime(stock.earnings_date, "%Y-%m-%d").date()
+        except ValueError:
+            earnings = None
+        if earnings and abs((earnings - (today or date.today())).days) <= EARNINGS_WINDOW_DAYS:
+            score += 1.0
+    return score
+
+
+def _route(stock: StockData, today: date | None = None) -> ModelRoute:
+    score = _significance(stock, today)
+    if score >= PREMIUM_SCORE:
+        tier = "premium"
+    elif score < TEMPLATE_SCORE:
+        tier = "template"
+    else:
+        tier = "standard"
+    return ModelRoute(ticker=stock.ticker, tier=tier, model=TIER_MODELS[tier], score=round(score, 2))
+
+
+def cost(model: str, input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+    if model not in MODEL_PRICING:
+        if model not in _unpriced:
+            _unpriced.add(model)
+            logger.warning("No MODEL_PRICING entry for %s; its cost is reported as $0", model)
+        return 0.0
+    price_in, price_cached, price_out = MODEL_PRICING[model]
+    uncached = input_tokens - cached_tokens
+    return (uncached * price_in + cached_tokens * price_cached + output_tokens * price_out) / 1e6
+
+
+async def _invoke(runnable: Runnable, route: ModelRoute, messages: Messages) -> tuple[dict, ModelRoute]:
+    """Invoke a structured runnable and fold latency, tokens and cost into the route."""
+    started = time.perf_counter()
+    out = await runnable.ainvoke(messages)
+    elapsed = time.perf_counter() - started
+
+    usage = getattr(out["raw"], "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0)
+    route = route.model_copy(update={
+        "calls": route.calls + 1,
+        "latency_s": route.latency_s + elapsed,
+        "input_tokens": route.input_tokens + input_tokens,
+        "cached_tokens": route.cached_tokens + cached_tokens,
+        "output_tokens": route.output_tokens + output_tokens,
+        "cost_usd": route.cost_usd + cost(route.model, input_tokens, cached_tokens, output_tokens),
+    })
+    return out, route
+
+
+async def _complete(route: ModelRoute, stage: str, messages: Messages) -> tuple[BaseModel | None, ModelRoute]:
+    """Run a stage with schema-constrained output and one targeted repair retry.
+
+    Returns None when the repair also fails to parse; both the retry and the
+    failure are counted on the route.
+    """
+    runnable = _llm(route.model, stage)
+    out, route = await _invoke(runnable, route, messages)
+    if out["parsed"] is not None:
+        return out["parsed"], route
+
+    route = route.model_copy(update={"parse_retries": route.parse_retries + 1})
+    repair = repair_messages(messages, STAGE_SCHEMAS[stage].__name__, out["parsing_error"])
+    out, route = await _invoke(runnable, route, repair)
+    if out["parsed"] is None:
+        route = route.model_copy(update={
+            "parse_failures": route.parse_failures + 1,
+            "fallback_stages": route.fallback_stages + [stage],
+        })
+    return out["parsed"], route
+
+
+def _market_context(state: State, stock: StockData) -> str:
+    return state.market_context.get(stock.ticker) or market_context(stock)
+
+
+def _template_analysis(stock: StockData) -> AnalysisResult:
+    if stock.change_percent > 1:
+        sentiment = "positive"
+    elif stock.change_percent < -1:
+        sentiment = "negative"
+    else:
+        sentiment = "neutral"
+    volume_ratio = stock.volume / stock.avg_volume_3m if stock.avg_volume_3m else 0.0
+    return AnalysisResult(
+        ticker=stock.ticker,
+        technical_analysis=(
+            f"{stock.ticker} moved {stock.change_percent:+.2f}% to ${stock.price:.2f} on "
+            f"{volume_ratio:.1f}x its 3-month average volume, within a 52-week range of "
+            f"${stock.week_52_low:.2f} – ${stock.week_52_high:.2f}."
+        ),
+        sentiment=sentiment,
+    )
+
+
+def _template_recommendation(stock: StockData) -> Recommendation:
+    return Recommendation(
+        ticker=stock.ticker,
+        action="Hold",
+        reasoning=f"Low-significance move ({stock.change_percent:+.2f}%); no model review performed.",
+        confidence=0.5,
+    )
 
+
+def emit(payload: dict) -> None:
+    """Send a chunk on the graph's "custom" stream; no-op outside a graph run."""
     try:
-        return json.loads(stripped)
-    except json.JSONDecodeError:
-        return {}
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer(payload)
+
+
+async def prefetch_node(state: State) -> State:
+    if not state.stocks or state.search_results:
+        return state
+    search_results = await prefetch_search(state.stocks)
+    return state.model_copy(update={"search_results": search_results})
 
 
 async def research_node(state: State) -> State:
     stock = _current_stock(state)
-    query = f"{stock.ticker} {stock.company_name} stock news today"
-    raw_results = await search.arun(query)
-
-    prompt = (
-        f"You are a financial research assistant. Below are raw search results for "
-        f"{stock.ticker} ({stock.company_name}).\n\n"
-        f"{raw_results}\n\n"
-        f"Produce a JSON object with exactly these keys:\n"
-        f'  "ticker": "{stock.ticker}",\n'
-        f'  "news_summary": "<2-3 sentence summary>",\n'
-        f'  "key_events": ["<event1>", "<event2>", ...]\n\n'
-        f"Return only the JSON object, no additional text."
-    )
-    response = await llm.ainvoke(prompt)
-    assert isinstance(response.content, str)
-    parsed = _parse_json(response.content)
-
-    result = ResearchResult(
-        ticker=parsed.get("ticker", stock.ticker),
-        news_summary=parsed.get("news_summary", raw_results[:500]),
-        key_events=parsed.get("key_events", []),
-    )
-    return state.model_copy(update={"research_results": state.research_results + [result]})
+    raw_results = state.search_results.get(stock.ticker)
+    if raw_results is None:
+        raw_results = await search.arun(search_query(stock))
+
+    route = _route(stock)
+    market_contexts = {**state.market_context, stock.ticker: _market_context(state, stock)}
+    if route.tier == "template":
+        result = ResearchResult(ticker=stock.ticker, news_summary=raw_results[:500])
+        return state.model_copy(update={
+            "research_results": state.research_results + [result],
+            "routes": state.routes + [route],
+            "market_context": market_contexts,
+        })
+
+    parsed, route = await _complete(route, "research", research_messages(stock, raw_results))
+
+    if parsed is not None:
+        result = parsed.model_copy(update={"ticker": stock.ticker})
+    else:
+        result = ResearchResult(ticker=stock.ticker, news_summary=raw_results[:500])
+    return state.model_copy(update={
+        "research_results": state.research_results + [result],
+        "routes": state.routes + [route],
+        "market_context": market_contexts,
+    })
 
 
 async def analyst_node(state: State) -> State:
     stock = _current_stock(state)
     research = state.research_results[-1]
+    route = state.routes[-1]
 
-    pe_str = f"{stock.pe_ratio:.2f}" if stock.pe_ratio is not None else "N/A"
-    prompt = (
-        f"You are a financial analyst. Analyse the following data for {stock.ticker} "
-        f"({stock.company_name}).\n\n"
-        f"Price: ${stock.price:.2f}  |  Change: ${stock.change:+.2f} ({stock.change_percent:+.2f}%)\n"
-        f"Volume: {stock.volume:,}  |  Avg Vol (3M): {stock.avg_volume_3m:,}\n"
-        f"Market Cap: {stock.market_cap}  |  P/E (TTM): {pe_str}\n"
-        f"52-Week Range: ${stock.week_52_low:.2f} – ${stock.week_52_high:.2f}  |  52W Chg: {stock.week_52_change_pct:+.2f}%\n\n"
-        f"News summary: {research.news_summary}\n"
-        f"Key events: {research.key_events}\n\n"
-        f"Produce a JSON object with exactly these keys:\n"
-        f'  "ticker": "{stock.ticker}",\n'
-        f'  "technical_analysis": "<2-3 sentences on price action, volume, momentum, and valuation>",\n'
-        f'  "sentiment": "<one of: positive, negative, neutral>"\n\n'
-        f"Return only the JSON object, no additional text."
-    )
-    response = await llm.ainvoke(prompt)
-    assert isinstance(response.content, str)
-    parsed = _parse_json(response.content)
-
-    result = AnalysisResult(
-        ticker=parsed.get("ticker", stock.ticker),
-        technical_analysis=parsed.get("technical_analysis", "Analysis unavailable."),
-        sentiment=parsed.get("sentiment", "neutral"),
-    )
-    return state.model_copy(update={"analysis_results": state.analysis_results + [result]})
+    if route.tier == "template":
+        result = _template_analysis(stock)
+        return state.model_copy(update={"analysis_results": state.analysis_results + [result]})
+
+    messages = analyst_messages(_market_context(state, stock), research)
+    parsed, route = await _complete(route, "analyst", messages)
+
+    if parsed is not None:
+        result = parsed.model_copy(update={"ticker": stock.ticker})
+    else:
+        result = AnalysisResult(
+            ticker=stock.ticker,
+            technical_analysis="Analysis unavailable.",
+            sentiment="neutral",
+        )
+    return state.model_copy(update={
+        "analysis_results": state.analysis_results + [result],
+        "routes": state.routes[:-1] + [route],
+    })
 
 
 async def strategist_node(state: State) -> State:
     stock = _current_stock(state)
     analysis = state.analysis_results[-1]
+    route = state.routes[-1]
 
-    pe_str = f"{stock.pe_ratio:.2f}" if stock.pe_ratio is not None else "N/A"
-    prompt = (
-        f"You are a senior investment strategist. Based on the following analysis for "
-        f"{stock.ticker} ({stock.company_name}) make a recommendation.\n\n"
-        f"Price: ${stock.price:.2f}  |  Change: ${stock.change:+.2f} ({stock.change_percent:+.2f}%)\n"
-        f"Market Cap: {stock.market_cap}  |  P/E (TTM): {pe_str}\n"
-        f"52-Week Range: ${stock.week_52_low:.2f} – ${stock.week_52_high:.2f}  |  52W Chg: {stock.week_52_change_pct:+.2f}%\n"
-        f"Volume: {stock.volume:,}  |  Avg Vol (3M): {stock.avg_volume_3m:,}\n\n"
-        f"Technical analysis: {analysis.technical_analysis}\n"
-        f"Sentiment: {analysis.sentiment}\n\n"
-        f"Produce a JSON object with exactly these keys:\n"
-        f'  "ticker": "{stock.ticker}",\n'
-        f'  "action": "<one of: Buy, Hold, Sell>",\n'
-        f'  "reasoning": "<2-3 sentences justifying the recommendation, referencing valuation and momentum>",\n'
-        f'  "confidence": <float between 0.0 and 1.0>\n\n'
-        f"Return only the JSON object, no additional text."
-    )
-    response = await llm.ainvoke(prompt)
-    assert isinstance(response.content, str)
-    parsed = _parse_json(response.content)
+    if route.tier == "template":
+        result = _template_recommendation(stock)
+        emit({"recommendation": result.model_dump(), "route": route.model_dump()})
+        return state.model_copy(update={"recommendations": state.recommendations + [result]})
 
-    confidence = parsed.get("confidence", 0.5)
-    try:
-        confidence = max(0.0, min(1.0, float(confidence)))
-    except (TypeError, ValueError):
-        confidence = 0.5
-
-    result = Recommendation(
-        ticker=parsed.get("ticker", stock.ticker),
-        action=parsed.get("action", "Hold"),
-        reasoning=parsed.get("reasoning", "Insufficient data for a recommendation."),
-        confidence=confidence,
-    )
-    return state.model_copy(update={"recommendations": state.recommendations + [result]})
+    messages = strategist_messages(_market_context(state, stock), analysis)
+    parsed, route = await _complete(route, "strategist", messages)
+
+    if parsed is not None:
+        result = parsed.model_copy(update={"ticker": stock.ticker})
+    else:
+        result = Recommendation(
+            ticker=stock.ticker,
+            action="Hold",
+            reasoning="Insufficient data for a recommendation.",
+            confidence=0.5,
+        )
+    emit({"recommendation": result.model_dump(), "route": route.model_dump()})
+    return state.model_copy(update={
+        "recommendations": state.recommendations + [result],
+        "routes": state.routes[:-1] + [route],
+    })
+
+
+async def run_stock_chain(state: State) -> State:
+    """Run research -> analyst -> strategist for the stock at current_index."""
+    state = await research_node(state)
+    state = await analyst_node(state)
+    return await strategist_node(state)
 
 
 async def supervisor_node(state: State) -> State:
-    return state.model_copy(update={"current_index": state.current_index + 1})
+    stock = _current_stock(state)
+    leaderboard = update_leaderboard(state.leaderboard, stock, state.recommendations[-1])
+    completed = state.current_index + 1
+    update: dict = {"current_index": completed, "leaderboard": leaderboard}
+
+    total = len(state.stocks)
+    if PROVISIONAL_EVERY > 0 and completed % PROVISIONAL_EVERY == 0 and completed < total:
+        summary = compose_provisional_summary(leaderboard, state.recommendations, completed, total)
+        update["provisional_summary"] = summary
+        emit({
+            "provisional_summary": summary,
+            "completed": completed,
+            "total": total,
+            "leaderboard": leaderboard.model_dump(),
+        })
+
+    return state.model_copy(update=update)
@@ -0,0 +1,82 @@
+"""Measure time-to-first-token and token cost of the analyst prompt layout.
+
+Runs the analyst stage for every stock in input.json against STANDARD_MODEL,
+through the same schema-bound runnable the graph uses (agents.build_llm), and
+reports mean TTFT, input/cached tokens and estimated cost. Compare the
+cache-friendly layout (static system prefix first) with the legacy layout
+(stock data first, instructions last):
+
+    python benchmarks/prompt_cache.py --layout prefix
+    python benchmarks/prompt_cache.py --layout legacy
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from langchain_core.runnables import Runnable
+
+from agents import STANDARD_MODEL, build_llm, cost
+from prompts import Messages, analyst_messages, market_context
+from state import Input, ResearchResult
+
+
+def _legacy(messages: Messages) -> Messages:
+    (_, system), (_, human) = messages
+    return [("human", f"{human}\n\n{system}")]
+
+
+async def _measure(runnable: Runnable, messages: Messages) -> tuple[float, dict, bool]:
+    """Stream one structured call; the first content or tool-call chunk counts as the first token."""
+    started = time.perf_counter()
+    ttft: float | None = None
+    out: dict = {}
+    async for event in runnable.astream_events(messages, version="v2"):
+        if event["event"] == "on_chat_model_stream" and ttft is None:
+            chunk = event["data"]["chunk"]
+            if chunk.content or chunk.tool_call_chunks:
+                ttft = time.perf_counter() - started
+        elif event["event"] == "on_chain_end" and not event["parent_ids"]:
+            out = event["data"]["output"]
+    usage = getattr(out.get("raw"), "usage_metadata", None) or {}
+    return ttft or time.perf_counter() - started, usage, out.get("parsed") is not None
+
+
+async def main(path: str, layout: str) -> None:
+    with open(path) as f:
+        stocks = Input(**json.load(f)).stocks
+
+    runnable = build_llm(STANDARD_MODEL, "analyst", stream_usage=True)
+    ttfts: list[float] = []
+    parsed = 0
+    input_tokens = cached_tokens = output_tokens = 0
+    for stock in stocks:
+        research = ResearchResult(ticker=stock.ticker, news_summary="No news available.")
+        messages = analyst_messages(market_context(stock), research)
+        if layout == "legacy":
+            messages = _legacy(messages)
+        ttft, usage, ok = await _measure(runnable, messages)
+        ttfts.append(ttft)
+        parsed += ok
+        input_tokens += usage.get("input_tokens", 0)
+        output_tokens += usage.get("output_tokens", 0)
+        cached_tokens += (usage.get("input_token_details") or {}).get("cache_read", 0)
+
+    print(f"layout={layout} model={STANDARD_MODEL} stocks={len(stocks)}")
+    print(f"  TTFT mean {statistics.mean(ttfts):.3f}s  median {statistics.median(ttfts):.3f}s")
+    print(f"  input tokens {input_tokens:,}  cached {cached_tokens:,}  output {output_tokens:,}")
+    print(f"  parsed {parsed}/{len(stocks)}")
+    print(f"  est. cost ${cost(STANDARD_MODEL, input_tokens, cached_tokens, output_tokens):.5f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default="input.json")
+    parser.add_argument("--layout", choices=("prefix", "legacy"), default="prefix")
+    args = parser.parse_args()
+    asyncio.run(main(args.input, args.layout))
@@ -0,0 +1,171 @@
+import csv
+import importlib.util
+import json
+import os
+from datetime import date
+
+from state import AnalysisResult, ModelRoute, Recommendation, ResearchResult, StockData
+
+SUPPORTED_FORMATS = ("xlsx", "csv", "parquet", "jsonl")
+
+
+def parse_formats(spec: str) -> list[str]:
+    """Parse a comma-separated format list, failing fast on anything unusable.
+
+    Runs at import so a typo in EXPORT_FORMATS stops the run before any stock
+    is researched, not in the report node at the end.
+    """
+    formats = [f.strip().lower() for f in spec.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in SUPPORTED_FORMATS]
+    if unknown:
+        raise ValueError(
+            f"Unsupported export format(s): {', '.join(unknown)} "
+            f"(supported: {', '.join(SUPPORTED_FORMATS)})"
+        )
+    if "parquet" in formats and importlib.util.find_spec("pyarrow") is None:
+        raise ValueError("Parquet export requires pyarrow: pip install 'daily-movers-agent[parquet]'")
+    return formats
+
+
+EXPORT_FORMATS = parse_formats(os.getenv("EXPORT_FORMATS", "xlsx"))
+
+RAW_HEADERS = [
+    "Ticker",
+    "Company",
+    "Price",
+    "Change",
+    "Change_Pct",
+    "Volume",
+    "Avg_Vol_3M",
+    "Market_Cap",
+    "PE_Ratio",
+    "Earnings_Date",
+    "Week_52_Change_Pct",
+    "Week_52_Low",
+    "Week_52_High",
+    "News_Summary",
+    "Key_Events",
+    "Technical_Analysis",
+    "Sentiment",
+    "Action",
+    "Reasoning",
+    "Confidence",
+    "Tier",
+    "Model",
+    "Fallback_Stages",
+    "Screens",
+]
+
+
+def build_raw_rows(
+    stocks: list[StockData],
+    analyses: list[AnalysisResult],
+    recommendations: list[Recommendation],
+    research_results: list[ResearchResult],
+    routes: list[ModelRoute],
+    screens: dict[str, list[str]],
+) -> list[list]:
+    """Join stocks with their research, analysis, recommendation, model route and screens.
+
+    Columns follow RAW_HEADERS. Missing agent output is None so every writer
+    sees the same typed values.
+    """
+    analysis_map = {a.ticker: a for a in analyses}
+    rec_map = {r.ticker: r for r in recommendations}
+    research_map = {r.ticker: r for r in research_results}
+    route_map = {r.ticker: r for r in routes}
+    screen_map: dict[str, list[str]] = {}
+    for screen, tickers in screens.items():
+        for t in tickers:
+            screen_map.setdefault(t, []).append(screen)
+
+    rows: list[list] = []
+    for stock in stocks:
+        ticker = stock.ticker
+        analysis = analysis_map.get(ticker)
+        rec = rec_map.get(ticker)
+        research = research_map.get(ticker)
+        route = route_map.get(ticker)
+
+        rows.append([
+            ticker,
+            stock.company_name,
+            stock.price,
+            stock.change,
+            stock.change_percent,
+            stock.volume,
+            stock.avg_volume_3m,
+            stock.market_cap,
+            stock.pe_ratio,
+            stock.earnings_date,
+            stock.week_52_change_pct,
+            stock.week_52_low,
+            stock.week_52_high,
+            research.news_summary if research else None,
+            "; ".join(research.key_events) if research else None,
+            analysis.technical_analysis if analysis else None,
+            analysis.sentiment if analysis else None,
+            rec.action if rec else None,
+            rec.reasoning if rec else None,
+            rec.confidence if rec else None,
+            route.tier if route else None,
+            route.model if route else None,
+            "; ".join(route.fallback_stages) if route and route.fallback_stages else None,
+            "; ".join(screen_map[ticker]) if ticker in screen_map else None,
+        ])
+    return rows
+
+
+def _write_csv(rows: list[list], path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(RAW_HEADERS)
+        writer.writerows(rows)
+
+
+def _write_jsonl(rows: list[list], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(RAW_HEADERS, row)), ensure_ascii=False))
+            f.write("\n")
+
+
+def _write_parquet(rows: list[list], path: str) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(
+            "Parquet export requires pyarrow: pip install 'daily-movers-agent[parquet]'"
+        ) from exc
+
+    columns = {header: [row[i] for row in rows] for i, header in enumerate(RAW_HEADERS)}
+    pq.write_table(pa.table(columns), path)
+
+
+WRITERS = {
+    "csv": _write_csv,
+    "jsonl": _write_jsonl,
+    "parquet": _write_parquet,
+}
+
+
+def export_rows(rows: list[list], formats: list[str], output_dir: str = "") -> dict[str, str]:
+    """Write the joined rows once per requested machine-readable format.
+
+    xlsx is handled by the report node; it is skipped here. Returns a
+    format -> path mapping of the files written.
+    """
+    unknown = [f for f in formats if f not in SUPPORTED_FORMATS]
+    if unknown:
+        raise ValueError(f"Unsupported export format(s): {', '.join(unknown)}")
+
+    stamp = date.today().strftime("%Y%m%d")
+    paths: dict[str, str] = {}
+    for fmt in formats:
+        if fmt == "xlsx":
+            continue
+        path = os.path.join(output_dir, f"daily_movers_raw_{stamp}.{fmt}")
+        WRITERS[fmt](rows, path)
+        paths[fmt] = path
+    return paths
@@ -0,0 +1,154 @@
+import json
+import sqlite3
+import time
+
+from pydantic import BaseModel
+
+from state import StockData
+
+LEASE_SECONDS = 300.0
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id      TEXT    NOT NULL,
+    ticker      TEXT    NOT NULL,
+    position    INTEGER NOT NULL,
+    stock       TEXT    NOT NULL,
+    search      TEXT,
+    status      TEXT    NOT NULL DEFAULT 'pending',
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    result      TEXT,
+    error       TEXT,
+    PRIMARY KEY (run_id, ticker)
+)
+"""
+
+
+class Job(BaseModel):
+    run_id: str
+    ticker: str
+    stock: StockData
+    search: str | None = None
+    attempts: int
+    worker: str
+
+
+class JobQueue:
+    """Durable per-stock work queue in a local SQLite file.
+
+    Jobs move pending -> running -> done | failed. A running job whose lease
+    expires (worker crashed or hung) is claimable again, so no broker or
+    heartbeat process is needed.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = LEASE_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        # The coordinator polls from worker threads (asyncio.to_thread), one call at a time.
+        self.conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def enqueue(self, run_id: str, stocks: list[StockData], search_results: dict[str, str]) -> None:
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO jobs (run_id, ticker, position, stock, search) VALUES (?, ?, ?, ?, ?)",
+            [
+                (run_id, s.ticker, i, s.model_dump_json(), search_results.get(s.ticker))
+                for i, s in enumerate(stocks)
+            ],
+        )
+
+    def claim(self, worker: str, run_id: str | None = None) -> Job | None:
+        """Lease the next pending (or lease-expired) job to a worker."""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Jobs that keep killing their worker stop being retried.
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired' "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, MAX_ATTEMPTS),
+            )
+            row = self.conn.execute(
+                "SELECT run_id, ticker, stock, search, attempts FROM jobs "
+                "WHERE (status = 'pending' OR (status = 'running' AND lease_until < ?)) "
+                "AND (? IS NULL OR run_id = ?) "
+                "ORDER BY position LIMIT 1",
+                (now, run_id, run_id),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE run_id = ? AND ticker = ?",
+                (worker, now + self.lease_seconds, row[0], row[1]),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        return Job(
+            run_id=row[0],
+            ticker=row[1],
+            stock=StockData.model_validate_json(row[2]),
+            search=row[3],
+            attempts=row[4] + 1,
+            worker=worker,
+        )
+
+    def complete(self, job: Job, result: dict) -> bool:
+        """Store a result; ignored (returns False) if the job's lease was reclaimed."""
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = 'done', result = ?, lease_until = NULL "
+            "WHERE run_id = ? AND ticker = ? AND worker = ? AND status = 'running'",
+            (json.dumps(result), job.run_id, job.ticker, job.worker),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Record a failed attempt; re-queue it unless MAX_ATTEMPTS is reached.
+
+        Like complete, only the worker still holding the lease can fail a job.
+        """
+        status = "failed" if job.attempts >= MAX_ATTEMPTS else "pending"
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, worker = NULL, lease_until = NULL "
+            "WHERE run_id = ? AND ticker = ? AND worker = ? AND status = 'running'",
+            (status, error, job.run_id, job.ticker, job.worker),
+        )
+        return cur.rowcount == 1
+
+    def requeue_worker(self, worker: str) -> int:
+        """Return a dead worker's running jobs to pending; returns how many."""
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_until = NULL "
+            "WHERE worker = ? AND status = 'running'",
+            (MAX_ATTEMPTS, worker),
+        )
+        return cur.rowcount
+
+    def remaining(self, run_id: str | None = None) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'running') AND (? IS NULL OR run_id = ?)",
+            (run_id, run_id),
+        ).fetchone()
+        return row[0]
+
+    def results(self, run_id: str) -> dict[str, dict]:
+        rows = self.conn.execute(
+            "SELECT ticker, result FROM jobs WHERE run_id = ? AND status = 'done' ORDER BY position",
+            (run_id,),
+        ).fetchall()
+        return {ticker: json.loads(result) for ticker, result in rows}
+
+    def purge(self, run_id: str) -> None:
+        self.conn.execute("DELETE FROM jobs WHERE run_id = ?", (run_id,))
@@ -1,9 +1,10 @@
 from langgraph.graph import END, START, StateGraph
 
-from agents import analyst_node, research_node, strategist_node, supervisor_node
+from agents import analyst_node, prefetch_node, research_node, strategist_node, supervisor_node
 from output import generate_email_node, generate_report_node
 from scraper import scraper_node
 from state import Input, Output, State
+from worker import WORKERS, sharded_node
 
 
 def should_continue(state: State) -> str:
@@ -12,31 +13,43 @@ def should_continue(state: State) -> str:
     return "report"
 
 
+def route_stocks(state: State) -> str:
+    if WORKERS > 0 and state.stocks:
+        return "sharded"
+    return should_continue(state)
+
+
 async def output_node(state: State) -> Output:
     return Output(
         excel_path=state.excel_path,
+        export_paths=state.export_paths,
         email_summary=state.email_summary,
         recommendations=state.recommendations,
+        routes=state.routes,
     )
 
 
 builder = StateGraph(State, input=Input, output=Output)
 
 builder.add_node("scraper", scraper_node)
+builder.add_node("prefetch", prefetch_node)
 builder.add_node("research", research_node)
 builder.add_node("analyst", analyst_node)
 builder.add_node("strategist", strategist_node)
 builder.add_node("supervisor", supervisor_node)
+builder.add_node("sharded", sharded_node)
 builder.add_node("report", generate_report_node)
 builder.add_node("email", generate_email_node)
 builder.add_node("output", output_node)
 
 builder.add_edge(START, "scraper")
+builder.add_edge("scraper", "prefetch")
 builder.add_conditional_edges(
-    "scraper",
-    should_continue,
-    {"research": "research", "report": "report"},
+    "prefetch",
+    route_stocks,
+    {"research": "research", "sharded": "sharded", "report": "report"},
 )
+builder.add_edge("sharded", "report")
 builder.add_edge("research", "analyst")
 builder.add_edge("analyst", "strategist")
 builder.add_edge("strategist", "supervisor")
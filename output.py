@@ -1,4 +1,6 @@
+import asyncio
 import os
+import re
 import smtplib
 from datetime import date
 from email.mime.base import MIMEBase
@@ -10,7 +12,18 @@ from openpyxl import Workbook
 from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.worksheet.worksheet import Worksheet
 
-from state import AnalysisResult, Recommendation, ResearchResult, State, StockData
+from export import EXPORT_FORMATS, RAW_HEADERS, build_raw_rows, export_rows
+from state import AnalysisResult, Recommendation, State, StockData
+from summary import (
+    compose_summary,
+    find_top_gainer,
+    find_top_loser,
+    find_top_recommended,
+    screen_title,
+    stocks_in_screen,
+    summarize_screens,
+    summarize_tiers,
+)
 
 GMAIL_SENDER = os.getenv("GMAIL_SENDER", "")
 GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD", "")
@@ -24,6 +37,9 @@ RED_FILL = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="soli
 GOLD_FILL = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
 CENTER = Alignment(horizontal="center", vertical="center")
 LEFT = Alignment(horizontal="left", vertical="center", wrap_text=True)
+# Characters Excel forbids in sheet titles; screen names come from callers.
+INVALID_SHEET_CHARS = re.compile(r"[\\/?*\[\]:]")
+MAX_SHEET_TITLE = 31
 
 SUMMARY_HEADERS = [
     "Ticker",
@@ -41,52 +57,9 @@ SUMMARY_HEADERS = [
     "Reasoning",
 ]
 
-RAW_HEADERS = [
-    "Ticker",
-    "Company",
-    "Price",
-    "Change",
-    "Change_Pct",
-    "Volume",
-    "Avg_Vol_3M",
-    "Market_Cap",
-    "PE_Ratio",
-    "Earnings_Date",
-    "Week_52_Change_Pct",
-    "Week_52_Low",
-    "Week_52_High",
-    "News_Summary",
-    "Key_Events",
-    "Technical_Analysis",
-    "Sentiment",
-    "Action",
-    "Reasoning",
-    "Confidence",
-]
-
-
-def _find_top_gainer(stocks: list[StockData]) -> StockData:
-    return max(stocks, key=lambda s: s.change_percent)
-
-
-def _find_top_loser(stocks: list[StockData]) -> StockData:
-    return min(stocks, key=lambda s: s.change_percent)
-
-
-def _find_top_recommended(recommendations: list[Recommendation]) -> list[Recommendation]:
-    buys = sorted(
-        [r for r in recommendations if r.action == "Buy"],
-        key=lambda r: r.confidence,
-        reverse=True,
-    )
-    if len(buys) >= 3:
-        return buys[:3]
-    holds = sorted(
-        [r for r in recommendations if r.action == "Hold"],
-        key=lambda r: r.confidence,
-        reverse=True,
-    )
-    return (buys + holds)[:3]
+def _sheet_title(screen: str) -> str:
+    title = INVALID_SHEET_CHARS.sub("-", screen_title(screen)).strip("'")[:MAX_SHEET_TITLE]
+    return title or "Screen"
 
 
 def _style_header_row(ws: Worksheet, row: int, col_count: int) -> None:
@@ -102,10 +75,14 @@ def _build_summary_sheet(
     stocks: list[StockData],
     analyses: list[AnalysisResult],
     recommendations: list[Recommendation],
+    screen: str | None = None,
 ) -> None:
     today = date.today().strftime("%B %d, %Y")
+    title = f"Daily Movers Report – {today}"
+    if screen:
+        title = f"{screen_title(screen)} – {today}"
 
-    ws.cell(row=1, column=1, value=f"Daily Movers Report – {today}")
+    ws.cell(row=1, column=1, value=title)
     ws.cell(row=1, column=1).font = TITLE_FONT
     ws.cell(row=1, column=1).alignment = LEFT
 
@@ -116,9 +93,9 @@ def _build_summary_sheet(
     analysis_map = {a.ticker: a for a in analyses}
     rec_map = {r.ticker: r for r in recommendations}
 
-    top_gainer_ticker = _find_top_gainer(stocks).ticker
-    top_loser_ticker = _find_top_loser(stocks).ticker
-    top_rec_tickers = {r.ticker for r in _find_top_recommended(recommendations)}
+    top_gainer_ticker = find_top_gainer(stocks).ticker
+    top_loser_ticker = find_top_loser(stocks).ticker
+    top_rec_tickers = {r.ticker for r in find_top_recommended(recommendations)}
 
     for row_offset, stock in enumerate(stocks):
         row = 3 + row_offset
@@ -167,50 +144,13 @@ def _build_summary_sheet(
         ws.column_dimensions[col_letter].width = w
 
 
-def _build_raw_sheet(
-    ws: Worksheet,
-    stocks: list[StockData],
-    analyses: list[AnalysisResult],
-    recommendations: list[Recommendation],
-    research_results: list[ResearchResult],
-) -> None:
+def _build_raw_sheet(ws: Worksheet, rows: list[list]) -> None:
     for col_idx, header in enumerate(RAW_HEADERS, start=1):
         ws.cell(row=1, column=col_idx, value=header)
     _style_header_row(ws, 1, len(RAW_HEADERS))
 
-    analysis_map = {a.ticker: a for a in analyses}
-    rec_map = {r.ticker: r for r in recommendations}
-    research_map = {r.ticker: r for r in research_results}
-
-    for row_offset, stock in enumerate(stocks):
+    for row_offset, values in enumerate(rows):
         row = 2 + row_offset
-        ticker = stock.ticker
-        analysis = analysis_map.get(ticker)
-        rec = rec_map.get(ticker)
-        research = research_map.get(ticker)
-
-        values = [
-            ticker,
-            stock.company_name,
-            stock.price,
-            stock.change,
-            stock.change_percent,
-            stock.volume,
-            stock.avg_volume_3m,
-            stock.market_cap,
-            stock.pe_ratio,
-            stock.earnings_date,
-            stock.week_52_change_pct,
-            stock.week_52_low,
-            stock.week_52_high,
-            research.news_summary if research else "",
-            "; ".join(research.key_events) if research else "",
-            analysis.technical_analysis if analysis else "",
-            analysis.sentiment if analysis else "",
-            rec.action if rec else "",
-            rec.reasoning if rec else "",
-            rec.confidence if rec else "",
-        ]
         for col_idx, val in enumerate(values, start=1):
             ws.cell(row=row, column=col_idx, value=val)
 
@@ -219,7 +159,7 @@ def _build_raw_sheet(
         ws.column_dimensions[col_letter].width = 22
 
 
-def _send_email(subject: str, body: str, excel_path: str) -> None:
+def _send_email(subject: str, body: str, attachments: list[str]) -> None:
     if not all([GMAIL_SENDER, GMAIL_APP_PASSWORD, GMAIL_RECIPIENT]):
         return
 
@@ -229,14 +169,15 @@ def _send_email(subject: str, body: str, excel_path: str) -> None:
     msg["Subject"] = subject
     msg.attach(MIMEText(body, "plain"))
 
-    with open(excel_path, "rb") as f:
-        attachment = MIMEBase("application", "octet-stream")
-        attachment.set_payload(f.read())
-        encoders.encode_base64(attachment)
-        attachment.add_header(
-            "Content-Disposition", "attachment", filename=excel_path
-        )
-        msg.attach(attachment)
+    for path in attachments:
+        with open(path, "rb") as f:
+            attachment = MIMEBase("application", "octet-stream")
+            attachment.set_payload(f.read())
+            encoders.encode_base64(attachment)
+            attachment.add_header(
+                "Content-Disposition", "attachment", filename=os.path.basename(path)
+            )
+            msg.attach(attachment)
 
     with smtplib.SMTP("smtp.gmail.com", 587) as server:
         server.starttls()
@@ -244,7 +185,7 @@ def _send_email(subject: str, body: str, excel_path: str) -> None:
         server.sendmail(GMAIL_SENDER, GMAIL_RECIPIENT, msg.as_string())
 
 
-async def generate_report_node(state: State) -> State:
+def _write_workbook(state: State, rows: list[list]) -> str:
     wb = Workbook()
 
     ws_summary = wb.active
@@ -257,72 +198,77 @@ async def generate_report_node(state: State) -> State:
         state.recommendations,
     )
 
+    if len(state.screens) > 1:
+        rec_map = {r.ticker: r for r in state.recommendations}
+        for screen, tickers in state.screens.items():
+            screen_stocks = stocks_in_screen(state.stocks, tickers)
+            if not screen_stocks:
+                continue
+            _build_summary_sheet(
+                wb.create_sheet(_sheet_title(screen)),
+                screen_stocks,
+                state.analysis_results,
+                [rec_map[t] for t in tickers if t in rec_map],
+                screen,
+            )
+
     ws_raw = wb.create_sheet("Raw Data")
-    _build_raw_sheet(
-        ws_raw,
+    _build_raw_sheet(ws_raw, rows)
+
+    filename = os.path.join(
+        state.output_dir, f"daily_movers_report_{date.today().strftime('%Y%m%d')}.xlsx"
+    )
+    wb.save(filename)
+    return filename
+
+
+async def generate_report_node(state: State) -> State:
+    rows = build_raw_rows(
         state.stocks,
         state.analysis_results,
         state.recommendations,
         state.research_results,
+        state.routes,
+        state.screens,
     )
+    # File writes (pyarrow, openpyxl) block; keep them off the event loop so a
+    # long-running service stays responsive to other runs.
+    export_paths = await asyncio.to_thread(export_rows, rows, EXPORT_FORMATS, state.output_dir)
 
-    filename = f"daily_movers_report_{date.today().strftime('%Y%m%d')}.xlsx"
-    wb.save(filename)
+    filename: str | None = None
+    if "xlsx" in EXPORT_FORMATS:
+        filename = await asyncio.to_thread(_write_workbook, state, rows)
+        export_paths["xlsx"] = filename
 
-    return state.model_copy(update={"excel_path": filename})
+    return state.model_copy(update={"excel_path": filename, "export_paths": export_paths})
 
 
 async def generate_email_node(state: State) -> State:
     stocks = state.stocks
     recommendations = state.recommendations
+    # Every written report file, workbook first, whichever EXPORT_FORMATS were chosen.
+    attachments = sorted(state.export_paths.values(), key=lambda p: not p.endswith(".xlsx"))
+
+    email_text = compose_summary(
+        f"Daily Movers Report – {date.today().strftime('%B %d, %Y')}",
+        find_top_gainer(stocks),
+        find_top_loser(stocks),
+        find_top_recommended(recommendations),
+        recommendations,
+        f"Full details in: {', '.join(attachments) or 'report not generated'}",
+        [
+            summarize_screens(stocks, recommendations, state.screens),
+            summarize_tiers(state.routes),
+        ],
+    )
 
-    top_gainer = _find_top_gainer(stocks)
-    top_loser = _find_top_loser(stocks)
-    top_recs = _find_top_recommended(recommendations)
-
-    rec_map = {r.ticker: r for r in recommendations}
-
-    lines: list[str] = []
-    lines.append(f"Daily Movers Report – {date.today().strftime('%B %d, %Y')}")
-    lines.append("=" * 55)
-    lines.append("")
-
-    lines.append("TOP GAINER")
-    lines.append("-" * 30)
-    tg_rec = rec_map.get(top_gainer.ticker)
-    lines.append(f"  {top_gainer.ticker} ({top_gainer.company_name})")
-    lines.append(f"  Price: ${top_gainer.price:.2f}  |  Change: +{top_gainer.change_percent}%")
-    lines.append(f"  Recommendation: {tg_rec.action if tg_rec else '—'}")
-    lines.append("")
-
-    lines.append("TOP LOSER")
-    lines.append("-" * 30)
-    tl_rec = rec_map.get(top_loser.ticker)
-    lines.append(f"  {top_loser.ticker} ({top_loser.company_name})")
-    lines.append(f"  Price: ${top_loser.price:.2f}  |  Change: {top_loser.change_percent}%")
-    lines.append(f"  Recommendation: {tl_rec.action if tl_rec else '—'}")
-    lines.append("")
-
-    lines.append("TOP 3 RECOMMENDATIONS")
-    lines.append("-" * 30)
-    for i, rec in enumerate(top_recs, start=1):
-        lines.append(
-            f"  {i}. {rec.ticker} – {rec.action} "
-            f"(confidence: {rec.confidence:.0%})"
-        )
-        lines.append(f"     {rec.reasoning}")
-    lines.append("")
-    lines.append("-" * 55)
-    lines.append(f"Full details in: {state.excel_path or 'report not generated'}")
-
-    email_text = "\n".join(lines)
-
-    summary_filename = f"daily_movers_summary_{date.today().strftime('%Y%m%d')}.txt"
+    summary_filename = os.path.join(
+        state.output_dir, f"daily_movers_summary_{date.today().strftime('%Y%m%d')}.txt"
+    )
     with open(summary_filename, "w") as f:
         f.write(email_text)
 
-    if state.excel_path:
-        subject = f"Daily Movers Report – {date.today().strftime('%B %d, %Y')}"
-        _send_email(subject, email_text, state.excel_path)
+    subject = f"Daily Movers Report – {date.today().strftime('%B %d, %Y')}"
+    await asyncio.to_thread(_send_email, subject, email_text, attachments)
 
     return state.model_copy(update={"email_summary": email_text})
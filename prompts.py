@@ -0,0 +1,92 @@
+from state import AnalysisResult, ResearchResult, StockData
+
+# Static per-stage instructions. They go first, as the system message, so every
+# call in a run shares the same prefix and provider-side prompt caching can
+# reuse it; all stock-specific data follows in the human message.
+RESEARCH_SYSTEM = (
+    "You are a financial research assistant. You will be given raw search results "
+    "for one stock.\n\n"
+    "Fill in the fields:\n"
+    "  ticker: the ticker symbol given\n"
+    "  news_summary: 2-3 sentence summary\n"
+    "  key_events: the key events, one per item"
+)
+
+ANALYST_SYSTEM = (
+    "You are a financial analyst. You will be given market data and a news summary "
+    "for one stock.\n\n"
+    "Fill in the fields:\n"
+    "  ticker: the ticker symbol given\n"
+    "  technical_analysis: 2-3 sentences on price action, volume, momentum, and valuation\n"
+    "  sentiment: one of positive, negative, neutral"
+)
+
+STRATEGIST_SYSTEM = (
+    "You are a senior investment strategist. You will be given market data and an "
+    "analyst's view for one stock. Make a recommendation.\n\n"
+    "Fill in the fields:\n"
+    "  ticker: the ticker symbol given\n"
+    "  action: one of Buy, Hold, Sell\n"
+    "  reasoning: 2-3 sentences justifying the recommendation, referencing valuation and momentum\n"
+    "  confidence: float between 0.0 and 1.0"
+)
+
+Messages = list[tuple[str, str]]
+
+
+def market_context(stock: StockData) -> str:
+    """Ticker-specific market block shared by the analyst and strategist prompts."""
+    pe_str = f"{stock.pe_ratio:.2f}" if stock.pe_ratio is not None else "N/A"
+    return (
+        f"{stock.ticker} ({stock.company_name})\n"
+        f"Price: ${stock.price:.2f}  |  Change: ${stock.change:+.2f} ({stock.change_percent:+.2f}%)\n"
+        f"Volume: {stock.volume:,}  |  Avg Vol (3M): {stock.avg_volume_3m:,}\n"
+        f"Market Cap: {stock.market_cap}  |  P/E (TTM): {pe_str}\n"
+        f"52-Week Range: ${stock.week_52_low:.2f} – ${stock.week_52_high:.2f}  |  "
+        f"52W Chg: {stock.week_52_change_pct:+.2f}%"
+    )
+
+
+def research_messages(stock: StockData, raw_results: str) -> Messages:
+    return [
+        ("system", RESEARCH_SYSTEM),
+        ("human", f"{stock.ticker} ({stock.company_name})\n\nSearch results:\n{raw_results}"),
+    ]
+
+
+def analyst_messages(context: str, research: ResearchResult) -> Messages:
+    return [
+        ("system", ANALYST_SYSTEM),
+        (
+            "human",
+            f"{context}\n\n"
+            f"News summary: {research.news_summary}\n"
+            f"Key events: {research.key_events}",
+        ),
+    ]
+
+
+def strategist_messages(context: str, analysis: AnalysisResult) -> Messages:
+    return [
+        ("system", STRATEGIST_SYSTEM),
+        (
+            "human",
+            f"{context}\n\n"
+            f"Technical analysis: {analysis.technical_analysis}\n"
+            f"Sentiment: {analysis.sentiment}",
+        ),
+    ]
+
+
+def repair_messages(messages: Messages, schema_name: str, error: object | None) -> Messages:
+    """Append a repair turn, keeping the original prefix intact for the cache.
+
+    error is None when the model answered without calling the schema tool at all.
+    """
+    if error is None:
+        problem = f"Your previous reply did not call the {schema_name} tool."
+    else:
+        problem = f"Your previous reply did not match the {schema_name} schema: {error}"
+    return messages + [
+        ("human", f"{problem}\nReply again with every field filled in."),
+    ]
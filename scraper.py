@@ -1,6 +1,7 @@
 import asyncio
 import json
 import re
+import sys
 from datetime import datetime, timezone
 
 import httpx
@@ -10,6 +11,12 @@ from bs4 import BeautifulSoup
 from state import State, StockData
 
 MOST_ACTIVE_URL = "https://finance.yahoo.com/markets/stocks/most-active/"
+SCREEN_URLS = {
+    "most_active": MOST_ACTIVE_URL,
+    "gainers": "https://finance.yahoo.com/markets/stocks/gainers/",
+    "losers": "https://finance.yahoo.com/markets/stocks/losers/",
+}
+DEFAULT_SCREENS = ["most_active"]
 MAX_STOCKS = 20
 HEADERS = {
     "User-Agent": (
@@ -81,9 +88,9 @@ def _try_parse_json(text: str) -> dict | list | None:
     return None
 
 
-async def _fetch_tickers(client: httpx.AsyncClient) -> list[str]:
-    """Fetch ticker symbols from Yahoo Finance most active stocks page."""
-    resp = await client.get(MOST_ACTIVE_URL, headers=HEADERS, timeout=30.0)
+async def _fetch_tickers(client: httpx.AsyncClient, url: str = MOST_ACTIVE_URL) -> list[str]:
+    """Fetch ticker symbols from a Yahoo Finance screen page (most active by default)."""
+    resp = await client.get(url, headers=HEADERS, timeout=30.0)
     resp.raise_for_status()
 
     soup = BeautifulSoup(resp.text, "html.parser")
@@ -158,52 +165,95 @@ def _ticker_to_stock(ticker_obj) -> StockData | None:
         return None
 
 
-async def scrape_yahoo_finance() -> list[StockData]:
-    """Scrape most active stocks from Yahoo Finance using yfinance library."""
-    try:
-        # Fetch tickers from Yahoo Finance page
-        async with httpx.AsyncClient() as client:
-            tickers = await _fetch_tickers(client)
+def _dedupe_stocks(stocks: list[StockData]) -> list[StockData]:
+    seen: dict[str, StockData] = {}
+    for stock in stocks:
+        seen.setdefault(stock.ticker, stock)
+    return list(seen.values())
 
-        if not tickers:
-            return []
 
-        # Fetch detailed data using yfinance
-        stocks: list[StockData] = []
-        for ticker in tickers:
-            try:
-                ticker_obj = yf.Ticker(ticker)
-                stock = _ticker_to_stock(ticker_obj)
-                if stock:
-                    stocks.append(stock)
-            except Exception:
-                # Skip tickers that fail to fetch
-                pass
+def _fetch_stocks(tickers: list[str]) -> list[StockData]:
+    """Fetch detailed data for each ticker using yfinance."""
+    stocks: list[StockData] = []
+    for ticker in tickers:
+        try:
+            ticker_obj = yf.Ticker(ticker)
+            stock = _ticker_to_stock(ticker_obj)
+            if stock:
+                stocks.append(stock)
+        except Exception:
+            # Skip tickers that fail to fetch
+            pass
+    return stocks
+
+
+async def scrape_screens(screens: list[str]) -> tuple[list[StockData], dict[str, list[str]]]:
+    """Scrape several Yahoo Finance screens, fetching each distinct ticker only once.
+
+    Returns the deduplicated stocks plus screen -> tickers membership, in
+    each screen's own order.
+    """
+    unknown = [name for name in screens if name not in SCREEN_URLS]
+    if unknown:
+        raise ValueError(f"Unknown screen(s): {', '.join(unknown)}")
 
-        return stocks
+    try:
+        # Fetch tickers from each Yahoo Finance screen page
+        async with httpx.AsyncClient() as client:
+            results = await asyncio.gather(
+                *(_fetch_tickers(client, SCREEN_URLS[name]) for name in screens),
+                return_exceptions=True,
+            )
+        members = {
+            name: tickers
+            for name, tickers in zip(screens, results)
+            if isinstance(tickers, list)
+        }
+        unique = list(dict.fromkeys(t for tickers in members.values() for t in tickers))
+
+        if not unique:
+            return [], {}
+
+        # yfinance is blocking; keep it off the event loop
+        stocks = await asyncio.to_thread(_fetch_stocks, unique)
+
+        fetched = {s.ticker for s in stocks}
+        members = {name: [t for t in tickers if t in fetched] for name, tickers in members.items()}
+        return stocks, members
 
     except Exception:
-        return []
+        return [], {}
+
+
+async def scrape_yahoo_finance() -> list[StockData]:
+    """Scrape most active stocks from Yahoo Finance using yfinance library."""
+    stocks, _ = await scrape_screens(DEFAULT_SCREENS)
+    return stocks
 
 
 async def scraper_node(state: State) -> State:
     if not state.stocks:
-        stocks = await scrape_yahoo_finance()
-        return state.model_copy(update={"stocks": stocks})
-    return state
+        stocks, screens = await scrape_screens(list(state.screens) or DEFAULT_SCREENS)
+        return state.model_copy(update={"stocks": stocks, "screens": screens})
+    return state.model_copy(update={"stocks": _dedupe_stocks(state.stocks)})
 
 
 if __name__ == "__main__":
-    stocks = asyncio.run(scrape_yahoo_finance())
+    screens = sys.argv[1:] or DEFAULT_SCREENS
+    stocks, members = asyncio.run(scrape_screens(screens))
 
     if not stocks:
         print("ERROR: scraper returned 0 stocks. Check network / Yahoo response.")
         raise SystemExit(1)
 
-    payload = {"stocks": [s.model_dump() for s in stocks]}
+    payload: dict = {"stocks": [s.model_dump() for s in stocks]}
+    if len(screens) > 1:
+        payload["screens"] = members
     with open("input.json", "w") as f:
         json.dump(payload, f, indent=2)
 
     print(f"Scraped {len(stocks)} stocks → input.json")
+    for name, tickers in members.items():
+        print(f"  [{name}] {len(tickers)} tickers")
     for s in stocks:
         print(f"  {s.ticker:6} {s.company_name:42} ${s.price:>10.2f}  {s.change_percent:+.2f}%  vol={s.volume:,}")
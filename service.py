@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from main import graph
+from state import Input, Output
+
+SERVICE_HOST = os.getenv("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8765"))
+SERVICE_RUNS_DIR = os.getenv("SERVICE_RUNS_DIR", "runs")
+# Comma-separated local HH:MM times for scheduled weekday runs, e.g. "09:45,12:30,15:45".
+SERVICE_SCHEDULE = os.getenv("SERVICE_SCHEDULE", "")
+SERVICE_MAX_CONCURRENT = int(os.getenv("SERVICE_MAX_CONCURRENT", "2"))
+MAX_RUN_HISTORY = 100
+
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+_runs: dict[str, dict] = {}
+_tasks: dict[str, asyncio.Task] = {}
+_semaphore: asyncio.Semaphore | None = None
+
+
+def _schedule_times(spec: str) -> list[tuple[int, int]]:
+    times: list[tuple[int, int]] = []
+    for item in spec.split(","):
+        item = item.strip()
+        if item:
+            hour, minute = item.split(":")
+            times.append((int(hour), int(minute)))
+    return sorted(times)
+
+
+def _next_run(times: list[tuple[int, int]], now: datetime) -> datetime:
+    """Next scheduled weekday slot strictly after now."""
+    day = now.replace(second=0, microsecond=0)
+    for offset in range(8):
+        candidate_day = day + timedelta(days=offset)
+        if candidate_day.weekday() >= 5:
+            continue
+        for hour, minute in times:
+            candidate = candidate_day.replace(hour=hour, minute=minute)
+            if candidate > now:
+                return candidate
+    raise ValueError("Empty schedule")
+
+
+async def _run(run_id: str, payload: dict) -> None:
+    """Invoke the compiled graph with its own output directory."""
+    record = _runs[run_id]
+    output_dir = os.path.join(SERVICE_RUNS_DIR, run_id)
+    os.makedirs(output_dir, exist_ok=True)
+
+    assert _semaphore is not None
+    async with _semaphore:
+        record["status"] = "running"
+        record["started_at"] = datetime.now().isoformat(timespec="seconds")
+        try:
+            run_input = Input(**payload).model_copy(update={"output_dir": output_dir})
+            result = await graph.ainvoke(run_input.model_dump())
+            record["output"] = Output(**result).model_dump()
+            record["status"] = "done"
+        except Exception as exc:
+            record["error"] = repr(exc)
+            record["status"] = "failed"
+        finally:
+            record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+            _tasks.pop(run_id, None)
+
+
+def _start_run(payload: dict, trigger: str) -> str:
+    run_id = uuid.uuid4().hex
+    _runs[run_id] = {"run_id": run_id, "trigger": trigger, "status": "queued"}
+    while len(_runs) > MAX_RUN_HISTORY:
+        oldest = next(iter(_runs))
+        if oldest in _tasks:
+            break
+        del _runs[oldest]
+    _tasks[run_id] = asyncio.create_task(_run(run_id, payload))
+    return run_id
+
+
+async def _dispatch(method: str, target: str, body: bytes) -> tuple[int, dict]:
+    url = urlsplit(target)
+    parts = [p for p in url.path.split("/") if p]
+
+    if parts == ["health"]:
+        return 200, {"status": "ok", "active_runs": len(_tasks)}
+
+    if parts == ["runs"]:
+        if method == "GET":
+            return 200, {"runs": list(_runs.values())}
+        if method != "POST":
+            return 405, {"error": f"{method} not allowed"}
+        try:
+            payload = json.loads(body) if body else {}
+            Input(**payload)
+        except ValueError as exc:
+            return 400, {"error": str(exc)}
+        run_id = _start_run(payload, "http")
+        if parse_qs(url.query).get("wait") == ["1"]:
+            task = _tasks.get(run_id)
+            if task is not None:
+                await asyncio.shield(task)
+            return 200, _runs[run_id]
+        return 202, _runs[run_id]
+
+    if len(parts) == 2 and parts[0] == "runs":
+        record = _runs.get(parts[1])
+        if record is None:
+            return 404, {"error": "unknown run"}
+        return 200, record
+
+    return 404, {"error": "not found"}
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = (await reader.readline()).decode("latin-1")
+        method, target, _ = request_line.split(" ", 2)
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", "0")))
+        status, payload = await _dispatch(method.upper(), target, body)
+    except Exception as exc:
+        status, payload = 400, {"error": repr(exc)}
+
+    data = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: close\r\n\r\n".encode()
+        + data
+    )
+    try:
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def _scheduler(times: list[tuple[int, int]]) -> None:
+    slot = _next_run(times, datetime.now())
+    while True:
+        # asyncio.sleep follows the monotonic clock; re-check the wall clock so a
+        # lagging clock never fires a slot early and then again on time.
+        while (delay := (slot - datetime.now()).total_seconds()) > 0:
+            await asyncio.sleep(delay)
+        _start_run({}, "schedule")
+        slot = _next_run(times, max(slot, datetime.now()))
+
+
+async def serve() -> None:
+    """Keep the graph, model clients and HTTP pools warm and accept runs.
+
+    Endpoints: POST /runs (Input JSON; add ?wait=1 to block for the Output),
+    GET /runs, GET /runs/<run_id>, GET /health. Each run writes into
+    SERVICE_RUNS_DIR/<run_id>, so overlapping runs never share files.
+    """
+    global _semaphore
+    _semaphore = asyncio.Semaphore(SERVICE_MAX_CONCURRENT)
+
+    times = _schedule_times(SERVICE_SCHEDULE)
+    scheduler = asyncio.create_task(_scheduler(times)) if times else None
+
+    server = await asyncio.start_server(_handle, SERVICE_HOST, SERVICE_PORT)
+    print(f"Daily movers service listening on http://{SERVICE_HOST}:{SERVICE_PORT}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if scheduler:
+            scheduler.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
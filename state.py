@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -26,31 +28,67 @@ class ResearchResult(BaseModel):
 class AnalysisResult(BaseModel):
     ticker: str
     technical_analysis: str
-    sentiment: str
+    sentiment: Literal["positive", "negative", "neutral"]
 
 
 class Recommendation(BaseModel):
     ticker: str
-    action: str
+    action: Literal["Buy", "Hold", "Sell"]
     reasoning: str
-    confidence: float
+    confidence: float = Field(ge=0, le=1)
+
+
+class ModelRoute(BaseModel):
+    ticker: str
+    tier: str
+    model: str
+    score: float
+    calls: int = 0
+    parse_retries: int = 0
+    parse_failures: int = 0
+    # Stages whose output is a fallback default because the repair retry also failed.
+    fallback_stages: list[str] = Field(default_factory=list)
+    latency_s: float = 0.0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+class Leaderboard(BaseModel):
+    top_gainer: StockData | None = None
+    top_loser: StockData | None = None
+    top_buys: list[Recommendation] = Field(default_factory=list)
+    top_holds: list[Recommendation] = Field(default_factory=list)
 
 
 class Input(BaseModel):
     stocks: list[StockData] = Field(default_factory=list)
+    screens: dict[str, list[str]] = Field(default_factory=dict)
+    output_dir: str = ""
 
 
 class State(BaseModel):
     stocks: list[StockData] = Field(default_factory=list)
+    screens: dict[str, list[str]] = Field(default_factory=dict)
+    output_dir: str = ""
     current_index: int = 0
+    search_results: dict[str, str] = Field(default_factory=dict)
+    market_context: dict[str, str] = Field(default_factory=dict)
     research_results: list[ResearchResult] = Field(default_factory=list)
     analysis_results: list[AnalysisResult] = Field(default_factory=list)
     recommendations: list[Recommendation] = Field(default_factory=list)
+    routes: list[ModelRoute] = Field(default_factory=list)
+    leaderboard: Leaderboard = Field(default_factory=Leaderboard)
+    provisional_summary: str | None = None
     excel_path: str | None = None
+    export_paths: dict[str, str] = Field(default_factory=dict)
     email_summary: str | None = None
 
 
 class Output(BaseModel):
     excel_path: str | None = None
+    export_paths: dict[str, str] = Field(default_factory=dict)
     email_summary: str | None = None
     recommendations: list[Recommendation] = Field(default_factory=list)
+    routes: list[ModelRoute] = Field(default_factory=list)
@@ -0,0 +1,194 @@
+import heapq
+from datetime import date
+
+from state import Leaderboard, ModelRoute, Recommendation, StockData
+
+
+def find_top_gainer(stocks: list[StockData]) -> StockData:
+    return max(stocks, key=lambda s: s.change_percent)
+
+
+def find_top_loser(stocks: list[StockData]) -> StockData:
+    return min(stocks, key=lambda s: s.change_percent)
+
+
+def find_top_recommended(recommendations: list[Recommendation]) -> list[Recommendation]:
+    buys = sorted(
+        [r for r in recommendations if r.action == "Buy"],
+        key=lambda r: r.confidence,
+        reverse=True,
+    )
+    if len(buys) >= 3:
+        return buys[:3]
+    holds = sorted(
+        [r for r in recommendations if r.action == "Hold"],
+        key=lambda r: r.confidence,
+        reverse=True,
+    )
+    return (buys + holds)[:3]
+
+
+def screen_title(screen: str) -> str:
+    return screen.replace("_", " ").title()
+
+
+def stocks_in_screen(stocks: list[StockData], tickers: list[str]) -> list[StockData]:
+    stock_map = {s.ticker: s for s in stocks}
+    return [stock_map[t] for t in tickers if t in stock_map]
+
+
+def compose_summary(
+    title: str,
+    top_gainer: StockData,
+    top_loser: StockData,
+    top_recs: list[Recommendation],
+    recommendations: list[Recommendation],
+    footer: str,
+    sections: list[list[str]] | None = None,
+) -> str:
+    rec_map = {r.ticker: r for r in recommendations}
+
+    lines: list[str] = []
+    lines.append(title)
+    lines.append("=" * 55)
+    lines.append("")
+
+    lines.append("TOP GAINER")
+    lines.append("-" * 30)
+    tg_rec = rec_map.get(top_gainer.ticker)
+    lines.append(f"  {top_gainer.ticker} ({top_gainer.company_name})")
+    lines.append(f"  Price: ${top_gainer.price:.2f}  |  Change: +{top_gainer.change_percent}%")
+    lines.append(f"  Recommendation: {tg_rec.action if tg_rec else '—'}")
+    lines.append("")
+
+    lines.append("TOP LOSER")
+    lines.append("-" * 30)
+    tl_rec = rec_map.get(top_loser.ticker)
+    lines.append(f"  {top_loser.ticker} ({top_loser.company_name})")
+    lines.append(f"  Price: ${top_loser.price:.2f}  |  Change: {top_loser.change_percent}%")
+    lines.append(f"  Recommendation: {tl_rec.action if tl_rec else '—'}")
+    lines.append("")
+
+    lines.append("TOP 3 RECOMMENDATIONS")
+    lines.append("-" * 30)
+    for i, rec in enumerate(top_recs, start=1):
+        lines.append(
+            f"  {i}. {rec.ticker} – {rec.action} "
+            f"(confidence: {rec.confidence:.0%})"
+        )
+        lines.append(f"     {rec.reasoning}")
+    lines.append("")
+    for section in sections or []:
+        if section:
+            lines.extend(section)
+            lines.append("")
+    lines.append("-" * 55)
+    lines.append(footer)
+
+    return "\n".join(lines)
+
+
+def summarize_tiers(routes: list[ModelRoute]) -> list[str]:
+    if not routes:
+        return []
+
+    lines = ["MODEL TIERS", "-" * 30]
+    for tier in ("premium", "standard", "template"):
+        tier_routes = [r for r in routes if r.tier == tier]
+        if not tier_routes:
+            continue
+        latency = sum(r.latency_s for r in tier_routes)
+        cost = sum(r.cost_usd for r in tier_routes)
+        line = (
+            f"  {tier:<9} {len(tier_routes):>3} stocks  |  "
+            f"avg {latency / len(tier_routes):.1f}s  |  ${cost:.4f}"
+        )
+        calls = sum(r.calls for r in tier_routes)
+        if calls:
+            retries = sum(r.parse_retries for r in tier_routes)
+            failures = sum(r.parse_failures for r in tier_routes)
+            line += f"  |  parse retries {retries}/{calls}, failures {failures}"
+        input_tokens = sum(r.input_tokens for r in tier_routes)
+        if input_tokens:
+            cached = sum(r.cached_tokens for r in tier_routes)
+            line += f"  |  cached {cached / input_tokens:.0%} of input"
+        lines.append(line)
+    return lines
+
+
+def summarize_screens(
+    stocks: list[StockData],
+    recommendations: list[Recommendation],
+    screens: dict[str, list[str]],
+) -> list[str]:
+    if len(screens) < 2:
+        return []
+
+    rec_map = {r.ticker: r for r in recommendations}
+    lines: list[str] = []
+    for screen, tickers in screens.items():
+        screen_stocks = stocks_in_screen(stocks, tickers)
+        if not screen_stocks:
+            continue
+        top_gainer = find_top_gainer(screen_stocks)
+        top_loser = find_top_loser(screen_stocks)
+        top_recs = find_top_recommended([rec_map[t] for t in tickers if t in rec_map])
+
+        lines.append(screen_title(screen).upper())
+        lines.append("-" * 30)
+        lines.append(f"  Top gainer: {top_gainer.ticker} ({top_gainer.change_percent:+.2f}%)")
+        lines.append(f"  Top loser:  {top_loser.ticker} ({top_loser.change_percent:+.2f}%)")
+        picks = ", ".join(f"{r.ticker} ({r.action})" for r in top_recs) or "—"
+        lines.append(f"  Top picks:  {picks}")
+        lines.append("")
+    return lines[:-1]
+
+
+def update_leaderboard(board: Leaderboard, stock: StockData, rec: Recommendation) -> Leaderboard:
+    """Fold one finished stock into the running leaderboard.
+
+    Bounded-heap equivalent of find_top_gainer / find_top_loser /
+    find_top_recommended, with the same tie-breaking (earliest stock wins).
+    """
+    top_gainer = board.top_gainer
+    if top_gainer is None or stock.change_percent > top_gainer.change_percent:
+        top_gainer = stock
+
+    top_loser = board.top_loser
+    if top_loser is None or stock.change_percent < top_loser.change_percent:
+        top_loser = stock
+
+    top_buys = board.top_buys
+    top_holds = board.top_holds
+    if rec.action == "Buy":
+        top_buys = heapq.nlargest(3, top_buys + [rec], key=lambda r: r.confidence)
+    elif rec.action == "Hold":
+        top_holds = heapq.nlargest(3, top_holds + [rec], key=lambda r: r.confidence)
+
+    return Leaderboard(
+        top_gainer=top_gainer,
+        top_loser=top_loser,
+        top_buys=top_buys,
+        top_holds=top_holds,
+    )
+
+
+def leaderboard_top_recommended(board: Leaderboard) -> list[Recommendation]:
+    return (board.top_buys + board.top_holds)[:3]
+
+
+def compose_provisional_summary(
+    board: Leaderboard,
+    recommendations: list[Recommendation],
+    completed: int,
+    total: int,
+) -> str:
+    assert board.top_gainer is not None and board.top_loser is not None
+    return compose_summary(
+        f"Daily Movers Report (provisional) – {date.today().strftime('%B %d, %Y')}",
+        board.top_gainer,
+        board.top_loser,
+        leaderboard_top_recommended(board),
+        recommendations,
+        f"Provisional: {completed} of {total} stocks processed.",
+    )
@@ -0,0 +1,16 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from state import StockData
+
+
+def make_stock(ticker: str = "A", change_pct: float = 1.0, **overrides) -> StockData:
+    """StockData with plain defaults; pass any field to override it."""
+    fields = dict(
+        ticker=ticker, company_name=f"{ticker} Co", price=100.0,
+        change=change_pct, change_percent=change_pct, volume=1_000_000,
+        avg_volume_3m=800_000, market_cap="10B", pe_ratio=None,
+        week_52_change_pct=10.0, week_52_low=80.0, week_52_high=120.0,
+    )
+    fields.update(overrides)
+    return StockData(**fields)
@@ -0,0 +1,155 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("SERPER_API_KEY", "test")
+
+import asyncio
+import json
+import logging
+from datetime import date
+
+import pytest
+
+import agents
+from main import graph
+from agents import MAX_VOLUME_SCORE, PREMIUM_SCORE, TEMPLATE_SCORE, _route, _significance
+from state import Input, ModelRoute, Recommendation, StockData
+from tests.conftest import make_stock
+
+
+def _stock(change_pct: float = 0.0, volume: int = 1_000_000, earnings_date: str | None = None) -> StockData:
+    return make_stock(change_pct=change_pct, volume=volume, avg_volume_3m=1_000_000, earnings_date=earnings_date)
+
+
+@pytest.mark.parametrize(
+    ("change_pct", "tier"),
+    [
+        (PREMIUM_SCORE * 5, "premium"),
+        (PREMIUM_SCORE * 5 - 0.05, "standard"),
+        (-PREMIUM_SCORE * 5, "premium"),
+        (TEMPLATE_SCORE * 5, "standard"),
+        (TEMPLATE_SCORE * 5 - 0.05, "template"),
+    ],
+)
+def test_route_tier_boundaries(change_pct, tier):
+    route = _route(_stock(change_pct))
+    assert route.tier == tier
+    assert route.model == agents.TIER_MODELS[tier]
+
+
+def test_volume_ratio_is_capped():
+    assert _significance(_stock(volume=10_000_000)) == MAX_VOLUME_SCORE
+    assert _significance(_stock(volume=3_000_000)) == 0.5
+    assert _significance(_stock(volume=500_000)) == 0.0
+
+
+@pytest.mark.parametrize("today", [date(2026, 10, 19), date(2026, 2, 4)])
+def test_most_active_screen_sends_only_outliers_to_premium(today):
+    # input.json is a real most-active screen: nearly every name trades above 2x
+    # its average volume, and on 2026-02-04 most of them are near earnings.
+    path = os.path.join(os.path.dirname(__file__), "..", "input.json")
+    with open(path) as f:
+        stocks = Input(**json.load(f)).stocks
+    routes = [_route(s, today) for s in stocks]
+    tiers = [r.tier for r in routes]
+
+    assert tiers.count("premium") <= len(stocks) // 5
+    assert tiers.count("standard") > len(stocks) // 2
+    assert {r.ticker for r in routes if r.tier == "premium"} == {"KELYB", "CISS", "PTON"}
+
+
+def test_earnings_window_bonus():
+    stock = _stock(earnings_date="2026-01-05")
+    assert _significance(stock, today=date(2026, 1, 2)) == 1.0
+    assert _significance(stock, today=date(2026, 1, 8)) == 1.0
+    assert _significance(stock, today=date(2026, 1, 9)) == 0.0
+    assert _significance(_stock(earnings_date="Jan 5, 2026"), today=date(2026, 1, 5)) == 0.0
+
+
+def test_unpriced_model_warns_once(monkeypatch, caplog):
+    monkeypatch.setattr(agents, "_unpriced", set())
+    with caplog.at_level(logging.WARNING, logger="agents"):
+        assert agents.cost("local-model", 1000, 0, 100) == 0.0
+        agents.cost("local-model", 1000, 0, 100)
+    assert [r.getMessage() for r in caplog.records] == [
+        "No MODEL_PRICING entry for local-model; its cost is reported as $0"
+    ]
+    assert agents.cost(next(iter(agents.MODEL_PRICING)), 1_000_000, 0, 0) > 0
+
+
+class _FakeUsage:
+    usage_metadata = {"input_tokens": 100, "output_tokens": 20}
+
+
+class _FakeRunnable:
+    """Stands in for the structured UiPathChat runnable, replaying canned outputs."""
+
+    def __init__(self, outputs: list[dict]):
+        self.outputs = outputs
+        self.messages: list = []
+
+    async def ainvoke(self, messages):
+        self.messages.append(messages)
+        return {"raw": _FakeUsage(), **self.outputs[len(self.messages) - 1]}
+
+
+def _complete_with(monkeypatch, outputs: list[dict]):
+    runnable = _FakeRunnable(outputs)
+    monkeypatch.setattr(agents, "_llm", lambda model, stage: runnable)
+    route = ModelRoute(ticker="A", tier="standard", model="m", score=2.0)
+    parsed, route = asyncio.run(agents._complete(route, "strategist", [("human", "go")]))
+    return parsed, route, runnable
+
+
+def test_complete_repairs_unparsed_reply(monkeypatch):
+    rec = Recommendation(ticker="A", action="Buy", reasoning="r", confidence=0.7)
+    parsed, route, runnable = _complete_with(monkeypatch, [
+        {"parsed": None, "parsing_error": "confidence: Input should be less than or equal to 1"},
+        {"parsed": rec, "parsing_error": None},
+    ])
+    assert parsed == rec
+    assert (route.calls, route.parse_retries, route.parse_failures) == (2, 1, 0)
+    assert route.input_tokens == 200
+    assert "less than or equal to 1" in runnable.messages[1][-1][1]
+
+
+def test_complete_counts_failure_after_repair(monkeypatch):
+    failed = {"parsed": None, "parsing_error": "action: Input should be 'Buy', 'Hold' or 'Sell'"}
+    parsed, route, runnable = _complete_with(monkeypatch, [failed, failed])
+    assert parsed is None
+    assert (route.calls, route.parse_retries, route.parse_failures) == (2, 1, 1)
+    assert route.fallback_stages == ["strategist"]
+    assert len(runnable.messages) == 2
+
+
+def test_complete_repair_when_no_tool_call(monkeypatch):
+    rec = Recommendation(ticker="A", action="Hold", reasoning="r", confidence=0.5)
+    parsed, route, runnable = _complete_with(monkeypatch, [
+        {"parsed": None, "parsing_error": None},
+        {"parsed": rec, "parsing_error": None},
+    ])
+    assert parsed == rec and route.fallback_stages == []
+    assert "did not call the Recommendation tool" in runnable.messages[1][-1][1]
+
+
+def test_graph_streams_recommendations_and_provisional_summaries(monkeypatch, tmp_path):
+    async def prefetch(stocks):
+        return {s.ticker: f"news for {s.ticker}" for s in stocks}
+
+    monkeypatch.setattr(agents, "prefetch_search", prefetch)
+    monkeypatch.setattr(agents, "PROVISIONAL_EVERY", 2)
+    # Small moves take the template tier, so the whole chain runs without a model.
+    stocks = [make_stock(t, change_pct=0.5 * (i + 1)) for i, t in enumerate("ABCDE")]
+
+    async def run():
+        run_input = {"stocks": [s.model_dump() for s in stocks], "output_dir": str(tmp_path)}
+        return [chunk async for chunk in graph.astream(run_input, stream_mode="custom")]
+
+    chunks = asyncio.run(run())
+
+    recs = [c["recommendation"]["ticker"] for c in chunks if "recommendation" in c]
+    assert recs == list("ABCDE")
+    provisional = [c for c in chunks if "provisional_summary" in c]
+    assert [(c["completed"], c["total"]) for c in provisional] == [(2, 5), (4, 5)]
+    assert provisional[-1]["leaderboard"]["top_gainer"]["ticker"] == "D"
+    assert "Provisional: 4 of 5 stocks processed." in provisional[-1]["provisional_summary"]
+    assert chunks.index(provisional[0]) == 2
@@ -0,0 +1,91 @@
+import csv
+import json
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+from state import AnalysisResult, ModelRoute, Recommendation, ResearchResult
+from export import RAW_HEADERS, _write_csv, _write_jsonl, _write_parquet, build_raw_rows, export_rows, parse_formats
+from tests.conftest import make_stock
+
+
+STOCKS = [make_stock("A"), make_stock("B")]
+RESEARCH = [ResearchResult(ticker="A", news_summary="news", key_events=["e1", "e2"])]
+ANALYSES = [AnalysisResult(ticker="A", technical_analysis="ta", sentiment="positive")]
+RECS = [Recommendation(ticker="A", action="Buy", reasoning="r", confidence=0.8)]
+SCREENS = {"most_active": ["A", "B"], "gainers": ["A"]}
+ROUTES = [
+    ModelRoute(ticker="A", tier="standard", model="gpt-4o-mini-2024-07-18", score=1.5,
+               parse_failures=1, fallback_stages=["strategist"]),
+]
+
+
+def test_rows_join_agent_output():
+    rows = build_raw_rows(STOCKS, ANALYSES, RECS, RESEARCH, ROUTES, SCREENS)
+    assert len(rows) == 2
+    a = dict(zip(RAW_HEADERS, rows[0]))
+    assert a["Key_Events"] == "e1; e2"
+    assert a["Action"] == "Buy"
+    assert a["PE_Ratio"] is None
+    assert a["Model"] == "gpt-4o-mini-2024-07-18"
+    assert a["Screens"] == "most_active; gainers"
+    assert a["Fallback_Stages"] == "strategist"
+
+
+def test_rows_missing_agent_output_are_none():
+    rows = build_raw_rows(STOCKS, ANALYSES, RECS, RESEARCH, ROUTES, SCREENS)
+    b = dict(zip(RAW_HEADERS, rows[1]))
+    assert b["News_Summary"] is None
+    assert b["Confidence"] is None
+
+
+def test_csv_and_jsonl_share_rows(tmp_path):
+    rows = build_raw_rows(STOCKS, ANALYSES, RECS, RESEARCH, ROUTES, SCREENS)
+    csv_path = tmp_path / "raw.csv"
+    jsonl_path = tmp_path / "raw.jsonl"
+    _write_csv(rows, str(csv_path))
+    _write_jsonl(rows, str(jsonl_path))
+
+    with open(csv_path, newline="") as f:
+        csv_rows = list(csv.reader(f))
+    assert csv_rows[0] == RAW_HEADERS
+    assert [r[0] for r in csv_rows[1:]] == ["A", "B"]
+
+    records = [json.loads(line) for line in jsonl_path.read_text().splitlines()]
+    assert records[0]["Confidence"] == 0.8
+    assert records[1]["Action"] is None
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        export_rows([], ["xls"])
+
+
+def test_parse_formats_normalizes_and_rejects_typos():
+    assert parse_formats(" CSV, jsonl ,") == ["csv", "jsonl"]
+    with pytest.raises(ValueError, match="xslx"):
+        parse_formats("csv,xslx")
+
+
+def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows = build_raw_rows(STOCKS, ANALYSES, RECS, RESEARCH, ROUTES, SCREENS)
+    path = tmp_path / "raw.parquet"
+    _write_parquet(rows, str(path))
+
+    table = pq.read_table(path)
+    assert table.column_names == RAW_HEADERS
+    records = table.to_pylist()
+    assert [r["Ticker"] for r in records] == ["A", "B"]
+    assert records[0]["Confidence"] == 0.8
+    assert records[0]["Screens"] == "most_active; gainers"
+    assert records[1]["Action"] is None
+
+
+def test_export_rows_writes_into_output_dir(tmp_path):
+    rows = build_raw_rows(STOCKS, ANALYSES, RECS, RESEARCH, ROUTES, SCREENS)
+    paths = export_rows(rows, ["xlsx", "csv"], str(tmp_path))
+    assert list(paths) == ["csv"]
+    assert os.path.dirname(paths["csv"]) == str(tmp_path)
+    assert os.path.exists(paths["csv"])
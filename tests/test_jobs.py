@@ -0,0 +1,62 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from jobs import MAX_ATTEMPTS, JobQueue
+from tests.conftest import make_stock
+
+
+def _queue(tmp_path, **kwargs) -> JobQueue:
+    queue = JobQueue(str(tmp_path / "queue.db"), **kwargs)
+    queue.enqueue("run", [make_stock("A"), make_stock("B")], {"A": "news"})
+    return queue
+
+
+def test_claim_in_order_and_complete(tmp_path):
+    queue = _queue(tmp_path)
+    job = queue.claim("w1")
+    assert job.ticker == "A" and job.search == "news" and job.attempts == 1
+    assert queue.claim("w2").ticker == "B"
+    assert queue.claim("w3") is None
+
+    queue.complete(job, {"ok": True})
+    assert queue.remaining("run") == 1
+    assert queue.results("run") == {"A": {"ok": True}}
+
+
+def test_dead_worker_jobs_are_requeued(tmp_path):
+    queue = _queue(tmp_path)
+    queue.claim("w1")
+    assert queue.requeue_worker("w1") == 1
+    job = queue.claim("w2")
+    assert job.ticker == "A" and job.attempts == 2
+
+
+def test_expired_lease_is_reclaimable(tmp_path):
+    queue = _queue(tmp_path, lease_seconds=-1)
+    queue.claim("w1")
+    assert queue.claim("w2").ticker == "A"
+
+
+def test_stale_worker_cannot_report_after_lease_reclaimed(tmp_path):
+    queue = _queue(tmp_path, lease_seconds=-1)
+    stale = queue.claim("w1")
+    current = queue.claim("w2")
+    assert current.ticker == stale.ticker == "A"
+
+    assert not queue.complete(stale, {"by": "w1"})
+    assert not queue.fail(stale, "late")
+    assert queue.remaining("run") == 2
+
+    assert queue.complete(current, {"by": "w2"})
+    assert queue.results("run") == {"A": {"by": "w2"}}
+    assert not queue.complete(current, {"by": "w2 again"})
+
+
+def test_failures_stop_after_max_attempts(tmp_path):
+    queue = _queue(tmp_path)
+    for _ in range(MAX_ATTEMPTS):
+        job = queue.claim("w1")
+        assert job.ticker == "A"
+        queue.fail(job, "boom")
+    assert queue.claim("w1").ticker == "B"
+    assert queue.results("run") == {}
@@ -1,28 +1,34 @@
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
-from state import StockData, Recommendation
-from output import _find_top_gainer, _find_top_loser, _find_top_recommended
+import asyncio
 
+from openpyxl import load_workbook
 
-def _stock(ticker: str, change_pct: float) -> StockData:
-    return StockData(
-        ticker=ticker, company_name=f"{ticker} Co", price=100.0,
-        change=change_pct, change_percent=change_pct, volume=1_000_000,
-        avg_volume_3m=800_000, market_cap="10B", pe_ratio=20.0,
-        week_52_change_pct=10.0, week_52_low=80.0, week_52_high=120.0,
-    )
+from state import Leaderboard, ModelRoute, State, Recommendation
+import output
+from output import GOLD_FILL, generate_email_node, generate_report_node
+from summary import (
+    find_top_gainer,
+    find_top_loser,
+    find_top_recommended,
+    leaderboard_top_recommended,
+    summarize_screens,
+    summarize_tiers,
+    update_leaderboard,
+)
+from tests.conftest import make_stock
 
 
-STOCKS = [_stock("A", 5.0), _stock("B", -12.0), _stock("C", 18.0)]
+STOCKS = [make_stock("A", 5.0), make_stock("B", -12.0), make_stock("C", 18.0)]
 
 
 def test_top_gainer():
-    assert _find_top_gainer(STOCKS).ticker == "C"
+    assert find_top_gainer(STOCKS).ticker == "C"
 
 
 def test_top_loser():
-    assert _find_top_loser(STOCKS).ticker == "B"
+    assert find_top_loser(STOCKS).ticker == "B"
 
 
 def test_top_recommended_buys_first_then_holds():
@@ -32,7 +38,7 @@ def test_top_recommended_buys_first_then_holds():
         Recommendation(ticker="C", action="Buy",  reasoning="yes", confidence=0.95),
         Recommendation(ticker="D", action="Hold", reasoning="meh", confidence=0.60),
     ]
-    top = _find_top_recommended(recs)
+    top = find_top_recommended(recs)
     assert [r.ticker for r in top] == ["C", "A", "D"]
 
 
@@ -43,6 +49,102 @@ def test_top_recommended_three_buys():
         Recommendation(ticker="Z", action="Buy", reasoning="c", confidence=0.92),
         Recommendation(ticker="W", action="Buy", reasoning="d", confidence=0.60),
     ]
-    top = _find_top_recommended(recs)
+    top = find_top_recommended(recs)
     assert len(top) == 3
     assert [r.ticker for r in top] == ["Z", "Y", "X"]
+
+
+def test_leaderboard_matches_batch_helpers():
+    stocks = STOCKS + [make_stock("D", 18.0), make_stock("E", -12.0)]
+    recs = [
+        Recommendation(ticker="A", action="Hold", reasoning="a", confidence=0.60),
+        Recommendation(ticker="B", action="Buy",  reasoning="b", confidence=0.80),
+        Recommendation(ticker="C", action="Sell", reasoning="c", confidence=0.95),
+        Recommendation(ticker="D", action="Buy",  reasoning="d", confidence=0.80),
+        Recommendation(ticker="E", action="Hold", reasoning="e", confidence=0.70),
+    ]
+    board = Leaderboard()
+    for stock, rec in zip(stocks, recs):
+        board = update_leaderboard(board, stock, rec)
+
+    assert board.top_gainer.ticker == find_top_gainer(stocks).ticker == "C"
+    assert board.top_loser.ticker == find_top_loser(stocks).ticker == "B"
+    assert leaderboard_top_recommended(board) == find_top_recommended(recs)
+
+
+def test_summarize_tiers_groups_by_tier():
+    routes = [
+        ModelRoute(ticker="A", tier="premium", model="big", score=4.0, calls=3, latency_s=3.0, cost_usd=0.002),
+        ModelRoute(ticker="B", tier="premium", model="big", score=3.5, calls=4, parse_retries=1,
+                   latency_s=5.0, cost_usd=0.004),
+        ModelRoute(ticker="C", tier="template", model="template", score=0.2),
+    ]
+    lines = summarize_tiers(routes)
+    assert lines[0] == "MODEL TIERS"
+    premium = next(l for l in lines if l.strip().startswith("premium"))
+    assert "avg 4.0s" in premium and "$0.0060" in premium
+    assert "parse retries 1/7, failures 0" in premium
+    template = next(l for l in lines if l.strip().startswith("template"))
+    assert "parse" not in template
+    assert not any(l.strip().startswith("standard") for l in lines)
+
+
+def test_summarize_screens_per_screen_tops():
+    recs = [
+        Recommendation(ticker="A", action="Buy",  reasoning="a", confidence=0.70),
+        Recommendation(ticker="C", action="Hold", reasoning="c", confidence=0.60),
+    ]
+    screens = {"gainers": ["C", "A"], "losers": ["B"]}
+    lines = summarize_screens(STOCKS, recs, screens)
+    assert lines[0] == "GAINERS"
+    assert "  Top gainer: C (+18.00%)" in lines
+    assert "  Top picks:  A (Buy), C (Hold)" in lines
+    assert "LOSERS" in lines
+    assert lines[-1] == "  Top picks:  —"
+
+
+def test_summarize_screens_single_screen_is_empty():
+    assert summarize_screens(STOCKS, [], {"most_active": ["A", "B", "C"]}) == []
+
+
+def test_screen_sheet_highlights_its_own_top_picks(tmp_path):
+    stocks = STOCKS + [make_stock("D", 1.0), make_stock("E", 2.0), make_stock("F", 1.5)]
+    recs = [Recommendation(ticker=t, action="Buy", reasoning=t, confidence=0.9) for t in "ABC"]
+    recs += [Recommendation(ticker=t, action="Hold", reasoning=t, confidence=0.5) for t in "DEF"]
+    state = State(
+        stocks=stocks,
+        recommendations=recs,
+        screens={"most_active": ["A", "B", "C"], "small_caps": ["D", "E", "F"]},
+        output_dir=str(tmp_path),
+    )
+
+    state = asyncio.run(generate_report_node(state))
+
+    ws = load_workbook(state.excel_path)["Small Caps"]
+    rows = {ws.cell(row=r, column=1).value: r for r in range(3, 6)}
+    assert ws.cell(row=rows["F"], column=1).fill.start_color.rgb == GOLD_FILL.start_color.rgb
+
+
+def test_email_sent_with_exports_when_xlsx_disabled(tmp_path, monkeypatch):
+    sent: list[tuple[str, list[str]]] = []
+    monkeypatch.setattr(output, "_send_email", lambda subject, body, attachments: sent.append((body, attachments)))
+    paths = {"csv": str(tmp_path / "raw.csv"), "jsonl": str(tmp_path / "raw.jsonl")}
+    state = State(stocks=STOCKS, output_dir=str(tmp_path), export_paths=paths)
+
+    state = asyncio.run(generate_email_node(state))
+
+    assert sent == [(state.email_summary, [paths["csv"], paths["jsonl"]])]
+    assert state.email_summary.endswith(f"Full details in: {paths['csv']}, {paths['jsonl']}")
+
+
+def test_screen_sheet_titles_are_sanitised(tmp_path):
+    state = State(
+        stocks=STOCKS,
+        screens={"Tech/Energy: [top]?": ["A", "C"], "x" * 40: ["B"]},
+        output_dir=str(tmp_path),
+    )
+
+    state = asyncio.run(generate_report_node(state))
+
+    titles = load_workbook(state.excel_path).sheetnames
+    assert titles == ["Daily Summary", "Tech-Energy- -Top--", "X" + "x" * 30, "Raw Data"]
@@ -0,0 +1,54 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from state import AnalysisResult, ResearchResult, StockData
+from prompts import (
+    ANALYST_SYSTEM,
+    analyst_messages,
+    market_context,
+    repair_messages,
+    research_messages,
+    strategist_messages,
+)
+from tests.conftest import make_stock
+
+
+def _stock(ticker: str, pe_ratio: float | None = 20.0) -> StockData:
+    return make_stock(ticker, change=-2.5, change_percent=-2.44, pe_ratio=pe_ratio)
+
+
+RESEARCH = ResearchResult(ticker="A", news_summary="news", key_events=["e1"])
+ANALYSIS = AnalysisResult(ticker="A", technical_analysis="ta", sentiment="negative")
+
+
+def test_static_prefix_shared_across_stocks():
+    a = research_messages(_stock("A"), "results A")
+    b = research_messages(_stock("B"), "results B")
+    assert a[0] == b[0]
+    assert a[0][0] == "system" and "A" not in a[0][1].split()
+
+
+def test_context_shared_by_analyst_and_strategist():
+    context = market_context(_stock("A"))
+    assert analyst_messages(context, RESEARCH)[1][1].startswith(context)
+    assert strategist_messages(context, ANALYSIS)[1][1].startswith(context)
+
+
+def test_market_context_formats_missing_pe():
+    context = market_context(_stock("A", pe_ratio=None))
+    assert "P/E (TTM): N/A" in context
+    assert "Change: $-2.50 (-2.44%)" in context
+
+
+def test_repair_keeps_original_messages_as_prefix():
+    messages = analyst_messages(market_context(_stock("A")), RESEARCH)
+    repaired = repair_messages(messages, "AnalysisResult", "missing field")
+    assert repaired[:2] == messages
+    assert repaired[0] == ("system", ANALYST_SYSTEM)
+    assert "missing field" in repaired[-1][1]
+
+
+def test_repair_without_tool_call_names_the_tool():
+    repaired = repair_messages([("human", "go")], "Recommendation", None)
+    assert repaired[-1][1].startswith("Your previous reply did not call the Recommendation tool.")
+    assert "None" not in repaired[-1][1]
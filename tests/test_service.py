@@ -0,0 +1,117 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("SERPER_API_KEY", "test")
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import service
+from service import _dispatch, _next_run, _schedule_times, _scheduler
+
+TIMES = _schedule_times(" 15:45,09:30 ")
+
+
+def test_schedule_times_sorted():
+    assert TIMES == [(9, 30), (15, 45)]
+    assert _schedule_times("") == []
+
+
+@pytest.mark.parametrize(
+    ("now", "expected"),
+    [
+        (datetime(2026, 10, 14, 8, 0), datetime(2026, 10, 14, 9, 30)),
+        (datetime(2026, 10, 14, 9, 30), datetime(2026, 10, 14, 15, 45)),
+        # After the last slot of the day rolls to the next morning.
+        (datetime(2026, 10, 14, 16, 0), datetime(2026, 10, 15, 9, 30)),
+        # Friday evening and the weekend roll to Monday.
+        (datetime(2026, 10, 16, 16, 0), datetime(2026, 10, 19, 9, 30)),
+        (datetime(2026, 10, 18, 12, 0), datetime(2026, 10, 19, 9, 30)),
+    ],
+)
+def test_next_run(now, expected):
+    assert _next_run(TIMES, now) == expected
+
+
+def test_scheduler_fires_each_slot_once_when_wall_clock_lags(monkeypatch):
+    clock = [datetime(2026, 10, 14, 9, 0)]
+    fired: list[datetime] = []
+
+    class _Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock[0]
+
+    async def sleep(seconds: float) -> None:
+        # The wall clock advances half a second less than the monotonic sleep.
+        clock[0] += timedelta(seconds=max(seconds - 0.5, 0.25))
+
+    def start_run(payload: dict, trigger: str) -> str:
+        fired.append(clock[0])
+        if len(fired) == 2:
+            raise asyncio.CancelledError
+        return "run"
+
+    monkeypatch.setattr(service, "datetime", _Clock)
+    monkeypatch.setattr(service.asyncio, "sleep", sleep)
+    monkeypatch.setattr(service, "_start_run", start_run)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(_scheduler(TIMES))
+
+    assert fired[0] >= datetime(2026, 10, 14, 9, 30)
+    assert fired[1] >= datetime(2026, 10, 14, 15, 45)
+
+
+class _StubGraph:
+    def __init__(self):
+        self.inputs: list[dict] = []
+
+    async def ainvoke(self, run_input: dict) -> dict:
+        self.inputs.append(run_input)
+        return {"email_summary": "done", "export_paths": {}}
+
+
+@pytest.fixture
+def stub_graph(monkeypatch, tmp_path):
+    graph = _StubGraph()
+    monkeypatch.setattr(service, "graph", graph)
+    monkeypatch.setattr(service, "SERVICE_RUNS_DIR", str(tmp_path))
+    monkeypatch.setattr(service, "_runs", {})
+    monkeypatch.setattr(service, "_tasks", {})
+    monkeypatch.setattr(service, "_semaphore", None)
+    return graph
+
+
+def _dispatch_in_service(method: str, target: str, body: bytes = b"") -> tuple[int, dict]:
+    async def run() -> tuple[int, dict]:
+        service._semaphore = asyncio.Semaphore(1)
+        status, payload = await _dispatch(method, target, body)
+        await asyncio.gather(*service._tasks.values())
+        return status, payload
+
+    return asyncio.run(run())
+
+
+def test_post_run_is_accepted(stub_graph, tmp_path):
+    status, record = _dispatch_in_service("POST", "/runs", json.dumps({"screens": {}}).encode())
+
+    assert status == 202
+    run_id = record["run_id"]
+    assert service._runs[run_id]["status"] == "done"
+    assert service._runs[run_id]["output"]["email_summary"] == "done"
+    assert stub_graph.inputs[0]["output_dir"] == os.path.join(str(tmp_path), run_id)
+
+
+def test_unknown_run_is_404(stub_graph):
+    assert _dispatch_in_service("GET", "/runs/missing") == (404, {"error": "unknown run"})
+
+
+def test_invalid_input_is_400(stub_graph):
+    status, payload = _dispatch_in_service("POST", "/runs", json.dumps({"stocks": [{"ticker": "A"}]}).encode())
+
+    assert status == 400
+    assert "company_name" in payload["error"]
+    assert service._runs == {} and stub_graph.inputs == []
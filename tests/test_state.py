@@ -1,4 +1,7 @@
-from state import StockData
+import pytest
+from pydantic import ValidationError
+
+from state import AnalysisResult, Recommendation, StockData
 
 
 def _make_stock(**overrides) -> StockData:
@@ -45,3 +48,16 @@ def test_earnings_date_defaults_none():
 def test_earnings_date_set():
     stock = _make_stock(earnings_date="2026-03-15")
     assert stock.earnings_date == "2026-03-15"
+
+
+def test_recommendation_action_and_confidence_validated():
+    with pytest.raises(ValidationError):
+        Recommendation(ticker="TEST", action="Strong Buy", reasoning="r", confidence=0.5)
+    with pytest.raises(ValidationError):
+        Recommendation(ticker="TEST", action="Buy", reasoning="r", confidence=1.2)
+    assert Recommendation(ticker="TEST", action="Sell", reasoning="r", confidence=0.0).action == "Sell"
+
+
+def test_analysis_sentiment_validated():
+    with pytest.raises(ValidationError):
+        AnalysisResult(ticker="TEST", technical_analysis="ta", sentiment="bullish")
@@ -0,0 +1,131 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("SERPER_API_KEY", "test")
+
+import asyncio
+import json
+
+import httpx
+
+import agents
+import tools
+from state import State
+from tests.conftest import make_stock
+
+
+def _serper_result(query: str) -> dict:
+    return {"organic": [{"title": query, "snippet": f"news for {query.split()[0]}"}]}
+
+
+def _use_transport(monkeypatch, handler) -> list[list[dict]]:
+    """Route Serper batch requests through handler; returns the request bodies seen."""
+    bodies: list[list[dict]] = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return handler(request, bodies[-1])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(record))
+    monkeypatch.setattr(tools, "_http_client", lambda: client)
+    return bodies
+
+
+def _live_search(monkeypatch) -> list[str]:
+    queries: list[str] = []
+
+    async def arun(self, query: str) -> str:
+        queries.append(query)
+        return f"live {query.split()[0]}"
+
+    monkeypatch.setattr(type(tools.search), "arun", arun)
+    return queries
+
+
+def test_prefetch_batches_queries(monkeypatch):
+    monkeypatch.setattr(tools, "SERPER_BATCH_SIZE", 2)
+    bodies = _use_transport(
+        monkeypatch, lambda request, body: httpx.Response(200, json=[_serper_result(q["q"]) for q in body])
+    )
+    live = _live_search(monkeypatch)
+
+    results = asyncio.run(tools.prefetch_search([make_stock("A"), make_stock("B"), make_stock("C")]))
+
+    assert [len(b) for b in bodies] == [2, 1]
+    assert list(results) == ["A", "B", "C"]
+    assert "news for A" in results["A"]
+    assert live == []
+
+
+def test_batch_payload_matches_live_search_params(monkeypatch):
+    monkeypatch.setattr(tools.search, "tbs", "qdr:d")
+    bodies = _use_transport(
+        monkeypatch, lambda request, body: httpx.Response(200, json=[_serper_result(q["q"]) for q in body])
+    )
+
+    asyncio.run(tools.prefetch_search([make_stock("A")]))
+
+    query = tools.search_query(make_stock("A"))
+    assert bodies == [[{"q": query, "gl": "us", "hl": "en", "num": 10, "tbs": "qdr:d"}]]
+
+
+def test_parse_result_matches_wrapper_output():
+    result = {
+        "knowledgeGraph": {"title": "A Co", "type": "Company", "attributes": {"CEO": "Jane"}},
+        "organic": [
+            {"snippet": "Shares jumped.", "attributes": {"Date": "today"}},
+            {"title": "no snippet"},
+        ],
+    }
+    assert tools._parse_result(result) == "A Co: Company. A Co CEO: Jane. Shares jumped. Date: today."
+    assert tools._parse_result({"answerBox": {"snippet": "a\nb"}, "organic": []}) == "a b"
+    assert tools._parse_result({"organic": []}) == "No good Google Search Result was found"
+
+
+def test_prefetch_failed_chunk_falls_back_to_single_searches(monkeypatch):
+    monkeypatch.setattr(tools, "SERPER_BATCH_SIZE", 2)
+
+    def handler(request, body):
+        if body[0]["q"].startswith("A "):
+            return httpx.Response(500)
+        return httpx.Response(200, json=[_serper_result(q["q"]) for q in body])
+
+    _use_transport(monkeypatch, handler)
+    live = _live_search(monkeypatch)
+
+    results = asyncio.run(tools.prefetch_search([make_stock("A"), make_stock("B"), make_stock("C")]))
+
+    assert results["A"] == "live A" and results["B"] == "live B"
+    assert "news for C" in results["C"]
+    assert sorted(q.split()[0] for q in live) == ["A", "B"]
+
+
+def test_research_node_searches_tickers_missing_from_prefetch(monkeypatch):
+    _use_transport(monkeypatch, lambda request, body: httpx.Response(500))
+    stocks = [make_stock("A"), make_stock("B")]
+
+    async def flaky(self, query: str) -> str:
+        if query.startswith("B "):
+            raise httpx.ConnectError("down")
+        return "live A"
+
+    monkeypatch.setattr(type(tools.search), "arun", flaky)
+    search_results = asyncio.run(tools.prefetch_search(stocks))
+    assert search_results == {"A": "live A"}
+
+    live = _live_search(monkeypatch)
+    state = State(stocks=stocks, search_results=search_results, current_index=1)
+    state = asyncio.run(agents.research_node(state))
+
+    assert live == [tools.search_query(stocks[1])]
+    assert state.routes[-1].tier == "template"
+    assert state.research_results[-1].news_summary == "live B"
+
+
+def test_http_client_is_per_event_loop():
+    async def twice():
+        return tools._http_client(), tools._http_client()
+
+    first, again = asyncio.run(twice())
+    second, _ = asyncio.run(twice())
+    assert first is again
+    assert second is not first
@@ -0,0 +1,122 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("SERPER_API_KEY", "test")
+
+import asyncio
+import threading
+
+import pytest
+
+import worker
+from jobs import JobQueue
+from state import AnalysisResult, ModelRoute, Recommendation, ResearchResult, State
+from tests.conftest import make_stock
+
+
+def _result(ticker: str) -> dict:
+    return {
+        "research": ResearchResult(ticker=ticker, news_summary="news").model_dump(),
+        "analysis": AnalysisResult(ticker=ticker, technical_analysis="ta", sentiment="neutral").model_dump(),
+        "recommendation": Recommendation(ticker=ticker, action="Buy", reasoning="r", confidence=0.7).model_dump(),
+        "route": ModelRoute(ticker=ticker, tier="standard", model="m", score=1.5).model_dump(),
+    }
+
+
+def _work(queue: JobQueue, worker_id: str, run_id: str) -> int:
+    while (job := queue.claim(worker_id, run_id)) is not None:
+        queue.complete(job, _result(job.ticker))
+    return 0
+
+
+def _crash_mid_job(queue: JobQueue, worker_id: str, run_id: str) -> int:
+    queue.claim(worker_id, run_id)
+    return -9
+
+
+def _die_on_start(queue: JobQueue, worker_id: str, run_id: str) -> int:
+    return 1
+
+
+class _FakeProcess:
+    """Thread-backed stand-in for a spawned worker process."""
+
+    def __init__(self, behaviour, args: tuple):
+        self.behaviour = behaviour
+        self.args = args
+        self.exitcode: int | None = None
+        self.thread = threading.Thread(target=self._run)
+
+    def _run(self) -> None:
+        queue_path, worker_id, run_id = self.args
+        queue = JobQueue(queue_path)
+        try:
+            self.exitcode = self.behaviour(queue, worker_id, run_id)
+        finally:
+            queue.close()
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def is_alive(self) -> bool:
+        return self.thread.is_alive()
+
+    def terminate(self) -> None:
+        pass
+
+    def join(self) -> None:
+        self.thread.join()
+
+
+def _spawn(monkeypatch, tmp_path, behaviours) -> list[_FakeProcess]:
+    spawned: list[_FakeProcess] = []
+
+    class _Context:
+        def Process(self, target, args, daemon):
+            proc = _FakeProcess(next(behaviours), args)
+            spawned.append(proc)
+            return proc
+
+    monkeypatch.setattr(worker.multiprocessing, "get_context", lambda method: _Context())
+    monkeypatch.setattr(worker, "WORKERS", 1)
+    monkeypatch.setattr(worker, "WORKER_QUEUE", str(tmp_path / "queue.db"))
+    monkeypatch.setattr(worker, "POLL_SECONDS", 0.01)
+    return spawned
+
+
+def test_poll_requeues_crashed_workers_jobs(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    queue.enqueue("run", [make_stock("A"), make_stock("B")], {})
+    crashed = _FakeProcess(_crash_mid_job, (queue.path, "w1", "run"))
+    crashed.start()
+    crashed.join()
+    procs = {"w1": crashed}
+
+    results, remaining, n_crashed = worker._poll(queue, procs, "run")
+
+    assert (results, remaining, n_crashed, procs) == ({}, 2, 1, {})
+    job = queue.claim("w2", "run")
+    assert job.ticker == "A" and job.attempts == 2
+
+
+def test_crashed_worker_is_replaced_and_its_ticker_completed(monkeypatch, tmp_path):
+    spawned = _spawn(monkeypatch, tmp_path, iter([_crash_mid_job, _work]))
+    stocks = [make_stock("A", 3.0), make_stock("B", -4.0)]
+
+    state = asyncio.run(worker.sharded_node(State(stocks=stocks)))
+
+    assert [p.exitcode for p in spawned] == [-9, 0]
+    assert [r.ticker for r in state.recommendations] == ["A", "B"]
+    assert [r.ticker for r in state.routes] == ["A", "B"]
+    assert state.current_index == 2
+    assert state.leaderboard.top_gainer.ticker == "A"
+    assert state.leaderboard.top_loser.ticker == "B"
+    assert JobQueue(worker.WORKER_QUEUE).remaining() == 0
+
+
+def test_workers_crashing_on_start_fail_the_run(monkeypatch, tmp_path):
+    monkeypatch.setattr(worker, "MAX_WORKER_CRASHES", 3)
+    spawned = _spawn(monkeypatch, tmp_path, iter(lambda: _die_on_start, None))
+
+    with pytest.raises(RuntimeError, match="3 worker processes crashed"):
+        asyncio.run(worker.sharded_node(State(stocks=[make_stock("A")])))
+    assert len(spawned) == 3
@@ -1,3 +1,127 @@
+import asyncio
+import os
+import weakref
+
+import httpx
 from langchain_community.utilities import GoogleSerperAPIWrapper
 
+from state import StockData
+
 search = GoogleSerperAPIWrapper()
+
+SERPER_URL = "https://google.serper.dev"
+# Serper accepts up to 100 queries in one request body.
+SERPER_BATCH_SIZE = 100
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "5"))
+
+_http: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+
+
+def _http_client() -> httpx.AsyncClient:
+    """Client for the running event loop, reused across runs on that loop.
+
+    A long-running service keeps its connection pool warm; separate
+    asyncio.run() calls (CLI runs, worker processes) each get their own
+    client, since an AsyncClient cannot be shared across loops.
+    """
+    loop = asyncio.get_running_loop()
+    client = _http.get(loop)
+    if client is None or client.is_closed:
+        client = _http[loop] = httpx.AsyncClient(timeout=30.0)
+    return client
+
+
+def search_query(stock: StockData) -> str:
+    return f"{stock.ticker} {stock.company_name} stock news today"
+
+
+def _query_params(query: str) -> dict:
+    """The request fields search.arun sends for one query, unset ones omitted."""
+    params = {"q": query, "gl": search.gl, "hl": search.hl, "num": search.k, "tbs": search.tbs}
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def _parse_result(result: dict) -> str:
+    """Flatten one Serper result into snippet text, matching search.arun's output."""
+    answer_box = result.get("answerBox") or {}
+    if answer_box.get("answer"):
+        return answer_box["answer"]
+    if answer_box.get("snippet"):
+        return answer_box["snippet"].replace("\n", " ")
+    if answer_box.get("snippetHighlighted"):
+        return " ".join(answer_box["snippetHighlighted"])
+
+    snippets: list[str] = []
+    kg = result.get("knowledgeGraph") or {}
+    if kg:
+        title = kg.get("title")
+        if kg.get("type"):
+            snippets.append(f"{title}: {kg['type']}.")
+        if kg.get("description"):
+            snippets.append(kg["description"])
+        for attribute, value in kg.get("attributes", {}).items():
+            snippets.append(f"{title} {attribute}: {value}.")
+
+    for item in result[search.result_key_for_type[search.type]][: search.k]:
+        if "snippet" in item:
+            snippets.append(item["snippet"])
+        for attribute, value in item.get("attributes", {}).items():
+            snippets.append(f"{attribute}: {value}.")
+
+    return " ".join(snippets) or "No good Google Search Result was found"
+
+
+async def _batch_search(client: httpx.AsyncClient, queries: list[str]) -> list[str]:
+    """Issue one Serper multi-query request and parse each result like search.arun does."""
+    payload = [_query_params(q) for q in queries]
+    resp = await client.post(
+        f"{SERPER_URL}/{search.type}",
+        headers={"X-API-KEY": search.serper_api_key or "", "Content-Type": "application/json"},
+        json=payload,
+        timeout=30.0,
+    )
+    resp.raise_for_status()
+    results = resp.json()
+    if not isinstance(results, list) or len(results) != len(queries):
+        raise ValueError("Unexpected Serper batch response")
+    return [_parse_result(r) for r in results]
+
+
+async def _pooled_search(queries: dict[str, str]) -> dict[str, str]:
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+    async def _one(ticker: str, query: str) -> tuple[str, str | None]:
+        async with semaphore:
+            try:
+                return ticker, await search.arun(query)
+            except Exception:
+                return ticker, None
+
+    pairs = await asyncio.gather(*(_one(t, q) for t, q in queries.items()))
+    return {t: r for t, r in pairs if r is not None}
+
+
+async def prefetch_search(stocks: list[StockData]) -> dict[str, str]:
+    """Run every stock's news query up front, keyed by ticker.
+
+    Uses Serper's multi-query endpoint; any chunk that fails is retried via a
+    bounded pool of single searches. Tickers missing from the result are
+    searched live by research_node.
+    """
+    queries = {s.ticker: search_query(s) for s in stocks}
+    tickers = list(queries)
+    results: dict[str, str] = {}
+    failed: dict[str, str] = {}
+
+    client = _http_client()
+    for start in range(0, len(tickers), SERPER_BATCH_SIZE):
+        chunk = tickers[start:start + SERPER_BATCH_SIZE]
+        try:
+            parsed = await _batch_search(client, [queries[t] for t in chunk])
+            results.update(zip(chunk, parsed))
+        except (httpx.HTTPError, ValueError, KeyError):
+            failed.update({t: queries[t] for t in chunk})
+
+    if failed:
+        results.update(await _pooled_search(failed))
+    return results
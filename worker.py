@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import uuid
+from multiprocessing.process import BaseProcess
+
+from agents import emit, run_stock_chain
+from jobs import Job, JobQueue
+from summary import update_leaderboard
+from state import AnalysisResult, Leaderboard, ModelRoute, Recommendation, ResearchResult, State
+
+# Number of local worker processes for the per-stock chain (0 runs it in-graph).
+WORKERS = int(os.getenv("WORKERS", "0"))
+WORKER_QUEUE = os.getenv("WORKER_QUEUE", "daily_movers_queue.db")
+POLL_SECONDS = 1.0
+# Abnormal worker exits tolerated while no ticker finishes, before the run fails
+# (a worker that dies on startup would otherwise be respawned forever).
+MAX_WORKER_CRASHES = int(os.getenv("MAX_WORKER_CRASHES", "5"))
+
+
+async def _process(job: Job) -> dict:
+    search_results = {job.ticker: job.search} if job.search is not None else {}
+    state = await run_stock_chain(State(stocks=[job.stock], search_results=search_results))
+    return {
+        "research": state.research_results[-1].model_dump(),
+        "analysis": state.analysis_results[-1].model_dump(),
+        "recommendation": state.recommendations[-1].model_dump(),
+        "route": state.routes[-1].model_dump(),
+    }
+
+
+async def run_worker(queue_path: str, worker_id: str, run_id: str | None = None, wait: bool = False) -> None:
+    """Claim and process jobs until the queue is drained (or forever with wait=True)."""
+    queue = JobQueue(queue_path)
+    try:
+        while True:
+            job = queue.claim(worker_id, run_id)
+            if job is None:
+                if not wait and queue.remaining(run_id) == 0:
+                    return
+                await asyncio.sleep(POLL_SECONDS)
+                continue
+            try:
+                result = await _process(job)
+            except Exception as exc:
+                queue.fail(job, repr(exc))
+                continue
+            queue.complete(job, result)
+    finally:
+        queue.close()
+
+
+def _worker_main(queue_path: str, worker_id: str, run_id: str) -> None:
+    asyncio.run(run_worker(queue_path, worker_id, run_id))
+
+
+def _collect(state: State, results: dict[str, dict]) -> State:
+    research_results: list[ResearchResult] = []
+    analysis_results: list[AnalysisResult] = []
+    recommendations: list[Recommendation] = []
+    routes: list[ModelRoute] = []
+    leaderboard = Leaderboard()
+
+    for stock in state.stocks:
+        result = results.get(stock.ticker)
+        if result is None:
+            continue
+        rec = Recommendation(**result["recommendation"])
+        research_results.append(ResearchResult(**result["research"]))
+        analysis_results.append(AnalysisResult(**result["analysis"]))
+        recommendations.append(rec)
+        routes.append(ModelRoute(**result["route"]))
+        leaderboard = update_leaderboard(leaderboard, stock, rec)
+
+    return state.model_copy(update={
+        "current_index": len(state.stocks),
+        "research_results": research_results,
+        "analysis_results": analysis_results,
+        "recommendations": recommendations,
+        "routes": routes,
+        "leaderboard": leaderboard,
+    })
+
+
+def _poll(queue: JobQueue, procs: dict[str, BaseProcess], run_id: str) -> tuple[dict[str, dict], int, int]:
+    """Reap exited workers (re-queuing a crashed one's jobs) and read the run's progress.
+
+    Returns the results so far, the jobs remaining and how many workers crashed.
+    """
+    crashed = 0
+    for worker_id, proc in list(procs.items()):
+        if not proc.is_alive():
+            del procs[worker_id]
+            if proc.exitcode != 0:
+                crashed += 1
+                queue.requeue_worker(worker_id)
+    return queue.results(run_id), queue.remaining(run_id), crashed
+
+
+def _shutdown(queue: JobQueue, procs: dict[str, BaseProcess], run_id: str) -> None:
+    for proc in procs.values():
+        proc.terminate()
+        proc.join()
+    queue.purge(run_id)
+    queue.close()
+
+
+async def sharded_node(state: State) -> State:
+    """Coordinator: shard stocks into the job queue and supervise WORKERS processes.
+
+    A worker that exits abnormally has its running tickers re-queued and is
+    replaced while work remains. Workers on other nodes can join the same
+    run with `python worker.py --queue <path> --wait`.
+    """
+    run_id = uuid.uuid4().hex
+    queue = await asyncio.to_thread(JobQueue, WORKER_QUEUE)
+    await asyncio.to_thread(queue.enqueue, run_id, state.stocks, state.search_results)
+
+    ctx = multiprocessing.get_context("spawn")
+    prefix = f"{socket.gethostname()}-{run_id[:8]}"
+    procs: dict[str, BaseProcess] = {}
+    spawned = 0
+    emitted: set[str] = set()
+    last_remaining = len(state.stocks)
+    crashes = 0
+
+    try:
+        while True:
+            # SQLite and process bookkeeping block, so they run off the event loop.
+            results, remaining, crashed = await asyncio.to_thread(_poll, queue, procs, run_id)
+            if remaining < last_remaining:
+                last_remaining = remaining
+                crashes = 0
+            crashes += crashed
+            if crashes >= MAX_WORKER_CRASHES:
+                raise RuntimeError(
+                    f"{crashes} worker processes crashed without finishing a ticker; "
+                    f"aborting sharded run with {remaining} jobs left"
+                )
+            for ticker, result in results.items():
+                if ticker not in emitted:
+                    emitted.add(ticker)
+                    emit({"recommendation": result["recommendation"], "route": result["route"]})
+
+            if remaining == 0:
+                break
+
+            while len(procs) < min(WORKERS, remaining):
+                worker_id = f"{prefix}-{spawned}"
+                spawned += 1
+                proc = ctx.Process(target=_worker_main, args=(WORKER_QUEUE, worker_id, run_id), daemon=True)
+                proc.start()
+                procs[worker_id] = proc
+
+            await asyncio.sleep(POLL_SECONDS)
+
+        return _collect(state, await asyncio.to_thread(queue.results, run_id))
+    finally:
+        await asyncio.to_thread(_shutdown, queue, procs, run_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process per-stock jobs from a shared queue.")
+    parser.add_argument("--queue", default=WORKER_QUEUE, help="path to the SQLite job queue")
+    parser.add_argument("--id", default=f"{socket.gethostname()}-{os.getpid()}", help="worker id")
+    parser.add_argument("--wait", action="store_true", help="keep polling when the queue is empty")
+    args = parser.parse_args()
+
+    asyncio.run(run_worker(args.queue, args.id, wait=args.wait))